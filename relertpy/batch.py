@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+# @Time: 2026/10/18 0:20
+# @Author: Chloride
+"""
+Batch processing of many maps over a process pool.
+
+Each map is loaded, passed to a transform, then saved,
+in a worker process of its own:
+
+    def fix(pmap):
+        pmap.init_elite = True
+        return len(pmap.triggers)
+
+    for i in run('maps/**/*.map', fix, workers=8, outdir='fixed'):
+        print(i.path, i.seconds, i.value if i.ok else i.error)
+
+Paths get sorted, and results come back in that order whatever
+the number of workers is, so runs are reproducible.  A transform
+must be picklable (a module-level function), or given as
+'module:function' to be imported by workers.  Whatever goes wrong
+with a map (its transform raising, returning something that can't
+be pickled, its worker dying) is reported in its own result.
+
+From the command line:
+
+    python -m relertpy.batch "maps/**/*.map" mymod:fix -j 8 -o fixed
+"""
+import argparse
+import pickle
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from glob import glob, has_magic
+from importlib import import_module
+from os import PathLike, cpu_count, makedirs, path as _path
+from time import perf_counter
+from typing import Callable, Iterable, Iterator, NamedTuple
+
+from .mapdata import MapClass
+
+__all__ = ['BatchResult', 'run', 'collect', 'main']
+
+EXTENSIONS = ('.map', '.mpr', '.yrm')
+
+
+class BatchResult(NamedTuple):
+    path: str
+    ok: bool
+    seconds: float
+    value: object = None  # what the transform returned
+    error: str = None  # traceback text when failed
+
+
+def collect(pattern: PathLike | str | Iterable) -> list[str]:
+    """
+    Sorted map paths matching a glob ('**' recurses), or a directory.
+
+    Iterables of paths are taken as they are, only sorted.
+    """
+    if isinstance(pattern, (str, PathLike)):
+        pattern = str(pattern)
+        if _path.isdir(pattern):
+            pattern = _path.join(pattern, '**', '*')
+        found = glob(pattern, recursive=True)
+        if has_magic(pattern):
+            found = [i for i in found
+                     if _path.splitext(i)[1].lower() in EXTENSIONS]
+    else:
+        found = list(pattern)
+    return sorted(set(_path.abspath(i) for i in found
+                      if _path.isfile(i)))
+
+
+def _resolve(transform):
+    if isinstance(transform, str):
+        module, _, name = transform.partition(':')
+        obj = import_module(module)
+        for i in name.split('.') if name else ():
+            obj = getattr(obj, i)
+        return obj
+    return transform
+
+
+def _process(job, pickled=False):
+    src, dst, transform, encoding, lazy = job
+    start = perf_counter()
+    try:
+        pmap = MapClass(src, encoding, lazy)
+        value = _resolve(transform)(pmap)
+        if dst is not None:
+            makedirs(_path.dirname(dst), exist_ok=True)
+            pmap.save(dst)
+        if pickled:
+            # fail this map here, not the whole chunk on the way back.
+            pickle.dumps(value)
+        return BatchResult(src, True, perf_counter() - start, value)
+    except Exception:
+        return BatchResult(src, False, perf_counter() - start,
+                           error=traceback.format_exc())
+
+
+def _processmany(jobs):
+    return [_process(i, True) for i in jobs]
+
+
+def run(pattern: PathLike | str | Iterable,
+        transform: Callable[[MapClass], object] | str,
+        *, workers: int = None, chunksize: int = None,
+        outdir: PathLike | str = None, save=True,
+        encoding='ansi', lazy=False) -> Iterator[BatchResult]:
+    """
+    Transform every matched map, yielding results one by one.
+
+    :param pattern: glob, directory or paths, see collect.
+    :param transform: called with each loaded map.
+    :param workers: processes to use, all cores by default.
+                    With 1 everything runs in this process.
+    :param chunksize: maps sent to a worker at a time,
+                      by default about 4 chunks per worker.
+    :param outdir: save into this directory instead of overwriting,
+                   keeping the layout relative to the matched maps.
+    :param save: set False for read-only transforms.
+    :param encoding: see MapClass.
+    :param lazy: see MapClass.
+    """
+    paths = collect(pattern)
+    if not paths:
+        return
+    root = _path.commonpath([_path.dirname(i) for i in paths])
+
+    def target(src):
+        if not save:
+            return None
+        if outdir is None:
+            return src
+        return _path.join(_path.abspath(outdir), _path.relpath(src, root))
+
+    jobs = [(i, target(i), transform, encoding, lazy) for i in paths]
+    workers = min(workers or cpu_count() or 1, len(jobs))
+    if workers <= 1:
+        yield from map(_process, jobs)
+        return
+    if chunksize is None:
+        chunksize = max(1, len(jobs) // (workers * 4))
+    chunks = [jobs[i:i + chunksize] for i in range(0, len(jobs), chunksize)]
+    with ProcessPoolExecutor(workers) as pool:
+        # waiting in the order of jobs, not the order they finish.
+        futures = [pool.submit(_processmany, i) for i in chunks]
+        for chunk, future in zip(chunks, futures):
+            try:
+                yield from future.result()
+            except Exception:
+                # the chunk got lost, like its worker dying.
+                error = traceback.format_exc()
+                yield from (BatchResult(i[0], False, 0.0, error=error)
+                            for i in chunk)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m relertpy.batch',
+        description="Apply a transform to many maps in parallel.")
+    parser.add_argument('pattern', help="glob or directory of maps")
+    parser.add_argument('transform', help="'module:function' taking a map")
+    parser.add_argument('-j', '--workers', type=int, default=None)
+    parser.add_argument('-c', '--chunksize', type=int, default=None)
+    parser.add_argument('-o', '--outdir', default=None,
+                        help="save here instead of overwriting")
+    parser.add_argument('-n', '--dry-run', action='store_true',
+                        help="don't save the maps")
+    parser.add_argument('-e', '--encoding', default='ansi')
+    parser.add_argument('--lazy', action='store_true')
+    args = parser.parse_args(argv)
+
+    failed = total = 0
+    elapsed = 0.0
+    start = perf_counter()
+    for i in run(args.pattern, args.transform, workers=args.workers,
+                 chunksize=args.chunksize, outdir=args.outdir,
+                 save=not args.dry_run, encoding=args.encoding,
+                 lazy=args.lazy):
+        total += 1
+        elapsed += i.seconds
+        if i.ok:
+            print("ok    %9.2f ms    %s" % (i.seconds * 1e3, i.path))
+        else:
+            failed += 1
+            print("FAIL  %9.2f ms    %s\n%s"
+                  % (i.seconds * 1e3, i.path, i.error), file=sys.stderr)
+    print("%d maps, %d failed, %.2f s in workers, %.2f s wall"
+          % (total, failed, elapsed, perf_counter() - start))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
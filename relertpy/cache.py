@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+# @Time: 2026/10/18 1:00
+# @Author: Chloride
+"""
+On-disk cache of INI tokens, skipping tokenization on warm starts.
+
+    rules = CCINIClass('rulesmd.ini', cache=True)
+    pmap = MapClass('a.map', 'utf-8', cache=ParseCache('.cache'))
+
+Entries are keyed by path and encoding.  An entry is taken as it is
+if size and mtime of the file match, or else when the content hash
+does (e.g. the file got touched or copied).  Least recently used
+entries are evicted once the cache grows beyond maxsize.
+
+The default directory is $RELERTPY_CACHE, or relertpy under the
+user cache directory.  Leave cache=None (the default) to bypass it.
+A cache failing to read or write never fails loading.
+Clear it by ParseCache().clear() or:
+
+    python -m relertpy.cache --clear
+"""
+import marshal
+import os
+from hashlib import blake2b
+from os import PathLike, path as _path
+from typing import Callable
+from uuid import uuid4
+
+__all__ = ['ParseCache', 'default_cache']
+
+# bump it once INIClass.tokenize gives something else.
+_VERSION = 1
+_SUFFIX = '.tok'
+
+
+class ParseCache:
+    """A directory of marshalled INIClass.tokenize results."""
+
+    def __init__(self, directory: PathLike | str = None,
+                 maxsize: int = 64 << 20):
+        """
+        :param directory: where entries go, see the module docs.
+        :param maxsize: bytes the entries could take in total.
+        """
+        if directory is None:
+            directory = os.environ.get('RELERTPY_CACHE') or _path.join(
+                os.environ.get('XDG_CACHE_HOME') or
+                _path.join(_path.expanduser('~'), '.cache'), 'relertpy')
+        self.directory = _path.abspath(directory)
+        self.maxsize = maxsize
+
+    def _entry(self, src, encoding):
+        key = f"{_path.abspath(src)}\0{encoding}".encode('utf-8')
+        return _path.join(self.directory,
+                          blake2b(key, digest_size=16).hexdigest() + _SUFFIX)
+
+    def load(self, src: PathLike | str, encoding: str,
+             tokenize: Callable[[bytes], list]):
+        """
+        Cached tokens of src, or tokenize(its bytes) stored.
+
+        :param src: the INI file.
+        :param encoding: text encoding, as a part of the key.
+        :param tokenize: bytes -> tokens, run on cache misses.
+        """
+        stat = os.stat(src)
+        dst = self._entry(src, encoding)
+        entry = self._read(dst)
+        if entry is not None and entry[1:3] == (stat.st_size,
+                                                stat.st_mtime_ns):
+            try:
+                os.utime(dst)  # recently used
+            except OSError:
+                pass
+            return entry[4]
+
+        with open(src, 'rb') as fp:
+            data = fp.read()
+        digest = blake2b(data, digest_size=16).digest()
+        if entry is not None and entry[3] == digest:
+            tokens = entry[4]
+        else:
+            tokens = tokenize(data)
+        self._write(dst, (_VERSION, stat.st_size, stat.st_mtime_ns,
+                          digest, tokens))
+        return tokens
+
+    @staticmethod
+    def _read(dst):
+        try:
+            with open(dst, 'rb') as fp:
+                # loads() of the whole is way faster than load(fp).
+                entry = marshal.loads(fp.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if type(entry) is not tuple or entry[:1] != (_VERSION,):
+            return None
+        return entry
+
+    def _write(self, dst, entry):
+        tmp = f"{dst}.{uuid4().hex[:8]}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp, 'wb') as fp:
+                fp.write(marshal.dumps(entry))
+            os.replace(tmp, dst)
+        except OSError:
+            # a cache failing to write shall not fail the loading.
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return
+        self.evict()
+
+    def entries(self):
+        """(path, size, last used) of every entry, oldest first."""
+        ret = []
+        try:
+            it = os.scandir(self.directory)
+        except OSError:
+            return ret
+        with it:
+            for i in it:
+                if i.name.endswith(_SUFFIX):
+                    try:
+                        stat = i.stat()
+                    except OSError:
+                        continue
+                    ret.append((i.path, stat.st_size, stat.st_mtime))
+        return sorted(ret, key=lambda x: x[2])
+
+    def size(self):
+        """Bytes taken by all entries."""
+        return sum(i[1] for i in self.entries())
+
+    def evict(self, maxsize: int = None):
+        """Remove least recently used entries until under maxsize."""
+        maxsize = self.maxsize if maxsize is None else maxsize
+        entries = self.entries()
+        total = sum(i[1] for i in entries)
+        for path, size, _ in entries:
+            if total <= maxsize:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self):
+        """Remove every entry."""
+        self.evict(0)
+
+
+_default = None
+
+
+def default_cache():
+    """The ParseCache used by cache=True."""
+    global _default
+    if _default is None:
+        _default = ParseCache()
+    return _default
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='python -m relertpy.cache',
+                                     description="Inspect the parse cache.")
+    parser.add_argument('-d', '--directory', default=None)
+    parser.add_argument('--clear', action='store_true')
+    args = parser.parse_args()
+    cache = ParseCache(args.directory)
+    if args.clear:
+        cache.clear()
+    print("%s: %d entries, %.1f KiB"
+          % (cache.directory, len(cache.entries()), cache.size() / 1024))
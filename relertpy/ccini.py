@@ -1,41 +1,97 @@
 # -*- coding: utf-8 -*-
 # @Time: 2022/04/20 0:00
 # @Author: Chloride
+import io
+import mmap
 import re
-from os import PathLike, path as _path
-from typing import MutableMapping
+from os import PathLike, fstat, remove, replace, path as _path
+from shutil import copymode
+from typing import IO, MutableMapping
+from uuid import uuid4
+from weakref import WeakValueDictionary
 
+from .cache import ParseCache, default_cache
 from .types import Array, Bool
 
 __all__ = ["INIClass", "CCINIClass",
            "INISectionClass",
            ]
 
+# both patterns start with a newline rather than '^',
+# so that the regex engine could jump between lines.
+# '[Section]:[Parent] ; comment' -> 'Section]:[Parent] '
+_HEADER = re.compile(r"\n\[([^\n;]*)")
+# ' Key = Value ; comment' -> (' Key ', ' Value ')
+_OPTION = re.compile(r"\n([^\n=;]*)=([^\n;]*)")
+# the same as _HEADER, but for raw bytes of an ASCII-compatible codec.
+_RAWHEADER = re.compile(rb"\n\[([^\r\n;]*)")
+_RAWFIRST = re.compile(rb"\[([^\r\n;]*)")
+# used by INISectionClass.tryparse
+_FLOAT = re.compile(r"^-?\d+\.?\d+$")
+_ARRAYSEP = re.compile(",+")
+_BOOLS = frozenset(Bool.bool_like)
+_NONES = frozenset(('none', '<none>'))
+
 
 class INISectionClass(MutableMapping):
     def __init__(self, section: str, _super=None, **kwargs):
         self.section = section
-        self.parent = _super
         self._map = {}
+        self._cache = {}  # parsed values, see tryparse
+        self._shared = False  # _map and _cache in use of clones
+        self._flat = None  # inherited keys, see flatten
+        self._children = None
+        self._parent = None
+        self.parent = _super
         if kwargs:
             self.update(kwargs)
 
+    @property
+    def parent(self):
+        return self._parent
+
+    @parent.setter
+    def parent(self, value):
+        if isinstance(value, INISectionClass):
+            i = value
+            while isinstance(i, INISectionClass):
+                if i is self:
+                    raise ValueError(f"Inheritance loop on [{self.section}].")
+                i = i._parent
+        # leave the old parent first, as it might be value again.
+        if isinstance(self._parent, INISectionClass):
+            self._parent._children.pop(id(self), None)
+        if isinstance(value, INISectionClass):
+            if value._children is None:
+                # sections are unhashable as mappings.
+                value._children = WeakValueDictionary()
+            value._children[id(self)] = self
+        self._parent = value
+        self._flat = None
+        self._invalidate()
+
     def __setitem__(self, k, v):
+        self._own()
+        if k not in self._map:
+            self._invalidate()
         self._map[k] = (Bool.tostring(v)  # to be consistent with FA2.
                         if type(v) == bool
                         else str(v))
+        self._cache.pop(k, None)
 
     def __delitem__(self, v):
+        self._own()
         del self._map[v]
+        self._cache.pop(v, None)
+        self._invalidate()
 
     def __getitem__(self, k):
         if k in self._map:
-            return self.tryparse(k, self._map[k])
-        elif (isinstance(self.parent, INISectionClass)
-              and k in self.parent):
-            return self.parent.tryparse(k, self.parent.get(k))
-        else:
+            return self.tryparse(k, None)
+        owner = self._owner(k)
+        if owner is None:
             raise KeyError(k)
+        return owner.tryparse(k, None)
 
     def __contains__(self, item):
         return item in self._map
@@ -61,11 +117,49 @@ class INISectionClass(MutableMapping):
     def get(self, key, default=None):
         if key in self._map:
             return self._map[key]
-        elif (isinstance(self.parent, INISectionClass)
-              and key in self.parent):
-            return self.parent.get(key, default)
-        else:
-            return default
+        owner = self._owner(key)
+        return default if owner is None else owner._map[key]
+
+    def flatten(self):
+        """
+        Merge options of this section and all its ancestors.
+
+        The inherited part is cached, so that later lookups of
+        inherited keys cost a single dict hit, until any
+        ancestor gets other keys or parents.
+        """
+        ret = {k: owner._map[k] for k, owner in self._inherited().items()}
+        ret.update(self._map)
+        return ret
+
+    def _inherited(self):
+        # key -> the nearest ancestor having it.
+        if self._flat is None:
+            if isinstance(self._parent, INISectionClass):
+                flat = dict(self._parent._inherited())
+                flat.update(dict.fromkeys(self._parent._map, self._parent))
+            else:
+                flat = {}
+            self._flat = flat
+        return self._flat
+
+    def _owner(self, key):
+        if self._flat is not None:
+            return self._flat.get(key)
+        i = self._parent
+        while isinstance(i, INISectionClass):
+            if key in i._map:
+                return i
+            i = i._parent
+        return None
+
+    def _invalidate(self):
+        # keys of this section changed, so do the inherited ones
+        # of its children, and theirs in turn.
+        for i in self._children.values() if self._children else ():
+            if i._flat is not None:
+                i._flat = None
+                i._invalidate()
 
     def values(self, *, useraw=False):
         return self._map.values() if useraw else super().values()
@@ -74,6 +168,7 @@ class INISectionClass(MutableMapping):
         return self._map.items() if useraw else super().items()
 
     def sortkeys(self, cond_expr=None):
+        self._own()
         _items = sorted(self._map.keys(), key=cond_expr)
         _o_sect = {k: self._map[k] for k in _items}
         self._map = _o_sect
@@ -81,35 +176,121 @@ class INISectionClass(MutableMapping):
     def copydata(self, ienum_keyvalpair):
         if not isinstance(ienum_keyvalpair, MutableMapping):
             raise TypeError("ienum_keyvalpair")
+        self._own()
         self._map = {str(k): str(v) for k, v in ienum_keyvalpair.items()}
+        self._cache.clear()
+        self._invalidate()
 
     def copyfrom(self, inisection):
         if not isinstance(inisection, INISectionClass):
             raise TypeError("inisection")
+        self._own()
         self.section = inisection.section
         self.parent = inisection.parent
         self._map = dict(inisection.items(useraw=True))
+        self._cache.clear()
+        self._invalidate()
+
+    def clone(self):
+        """
+        A copy sharing options with this one, until either is written.
+
+        The parent stays the same, see INIClass.clone for re-linking.
+        """
+        ret = object.__new__(type(self))
+        vars(ret).update(vars(self))
+        ret._flat = None
+        ret._children = None
+        if '_map' in vars(self):
+            self._shared = ret._shared = True
+        else:  # unparsed, see _LazySectionClass
+            ret._cache = {}
+            ret._chunks = list(self._chunks)
+        if isinstance(self._parent, INISectionClass):
+            ret._parent = None
+            ret.parent = self._parent
+        return ret
+
+    def _own(self):
+        # copy on write, leaving clones the original options.
+        if self._shared:
+            self._map = dict(self._map)
+            self._cache = dict(self._cache)
+            self._shared = False
 
     def tryparse(self, option, fallback):
+        # values are parsed once, until the option gets changed.
         try:
-            value: str = self._map[option]
+            value = self._cache[option]
         except KeyError:
-            return fallback
-
+            try:
+                value = self._cache[option] = self.parse(self._map[option])
+            except KeyError:
+                return fallback
+        # Arrays are mutable, callers shall not share the cached one.
+        return value.copy() if type(value) is Array else value
+
+    @staticmethod
+    def parse(value: str):
         if value.isdecimal():  # int
             return int(value)
-        elif re.match(r"^-?\d+\.?\d+$", value):  # float
+        elif _FLOAT.match(value):  # float
             return float(value)
-        elif value.lower() in Bool.bool_like:  # bool
+        lower = value.lower()
+        if lower in _BOOLS:  # bool
             return Bool.parse(value)
-        elif value.lower() in ('none', '<none>'):  # NoneType
+        elif lower in _NONES:  # NoneType
             return None
-        elif re.findall(",+", value):  # Array
-            return Array(i.strip() for i in re.split(",+", value))
+        elif ',' in value:  # Array
+            return Array(i.strip() for i in _ARRAYSEP.split(value))
         else:  # str itself
             return value
 
 
+class _LazySectionClass(INISectionClass):
+    """
+    A section whose options stay in the source buffer
+    until any of them is accessed.
+    """
+
+    def __init__(self, section, chunk, encoding, loader):
+        super().__init__(section)
+        del self._map  # see __getattr__
+        self._head = self.tostring()
+        self._chunks = [chunk]
+        self._codec = encoding
+        self._loader = loader
+
+    def __getattr__(self, item):
+        # only called when the options haven't been parsed yet.
+        if item != '_map':
+            raise AttributeError(item)
+        self._map = {}
+        for text in self.rawtext():
+            self._loader(self, _HEADER.split(f"\n{text}", 1)[2])
+        self._chunks = []
+        return self._map
+
+    @property
+    def untouched(self):
+        """Whether the raw text still stands for this section."""
+        return ('_map' not in vars(self)
+                and self.tostring() == self._head)
+
+    def rawtext(self):
+        """Raw text of each [Section] chunk, newlines normalized."""
+        for buf, start, end in self._chunks:
+            text = buf[start:end].decode(self._codec)
+            if '\r' in text:
+                text = text.replace('\r\n', '\n').replace('\r', '\n')
+            yield text if text.endswith('\n') else f"{text}\n"
+
+    def detach(self):
+        """Copy the raw chunks out of the (mapped) source file."""
+        self._chunks = [(bytes(buf[start:end]), 0, end - start)
+                        for buf, start, end in self._chunks]
+
+
 class INIClass:
     """C&C INI handler.
 
@@ -117,7 +298,7 @@ class INIClass:
 
     - section inheritance: '[A]:[B]'
     - fast append: '+= C'
-    - include sub inis: '[#include]' (NOT directly)
+    - include sub inis: '[#include]' (NOT directly, see LayeredINI)
 
     """
     __diff = 0  # for multiple inis processing
@@ -164,12 +345,29 @@ class INIClass:
         if self.hassection(section):
             del self._raw[section]
 
+    def clone(self):
+        """
+        A copy whose sections share options with these ones.
+
+        A section gets copied once it's written, by either side,
+        so clones take little memory until they differ.
+        """
+        ret = object.__new__(type(self))
+        vars(ret).update(vars(self))
+        clones = {id(i): i.clone() for i in self._raw.values()}
+        ret._raw = {k: clones[id(v)] for k, v in self._raw.items()}
+        for i in clones.values():
+            if id(i.parent) in clones:
+                i.parent = clones[id(i.parent)]
+        return ret
+
     def rename(self, _old, _new):
         if self.hassection(_new) or _old == _new:
             raise KeyError(f'Section "{_new}" already exists!')
-        self[_new] = self[_old]
-        self[_new].section = _new
-        del self._raw[_old]
+        # the section keeps its place, children and parent.
+        self._raw[_old].section = _new
+        self._raw = {(_new if k == _old else k): v
+                     for k, v in self._raw.items()}
 
     def getsection(self, section):
         return self._raw.get(section,
@@ -195,7 +393,7 @@ class INIClass:
         _o_raw = {k: self._raw[k] for k in _sects}
         self._raw = _o_raw
 
-    def load(self, *ccinis, encoding='utf-8'):
+    def load(self, *ccinis, encoding='utf-8', lazy=False, cache=None):
         """
         Load C&C ini(s).
 
@@ -204,84 +402,249 @@ class INIClass:
 
         :param ccinis: INI file path(s), make sure the order of them.
         :param encoding: text encoding.
+        :param lazy: map the file(s) into memory, and only parse
+                     a section when it's first used.
+                     The encoding should be ASCII-compatible then.
+        :param cache: a ParseCache keeping tokens of the file(s),
+                      True for the default one.  Ignored if lazy.
         """
+        if cache is True:
+            cache = default_cache()
         for ref in ccinis:
             try:
-                with open(ref, 'r', encoding=encoding) as fp:
-                    self.__fread(fp)
+                if lazy:
+                    with open(ref, 'rb') as fp:
+                        if not fstat(fp.fileno()).st_size:
+                            continue  # mmap refuses empty files
+                        buf = mmap.mmap(fp.fileno(), 0,
+                                        access=mmap.ACCESS_READ)
+                elif isinstance(cache, ParseCache):
+                    buf = cache.load(ref, encoding, lambda data: self.tokenize(
+                        _universal(data.decode(encoding))))
+                else:
+                    with open(ref, 'r', encoding=encoding) as fp:
+                        buf = fp.read()
             except OSError:
                 continue
+            if lazy:
+                self.__index(buf, encoding)
+            elif isinstance(buf, list):
+                self.__replay(buf)
+            else:
+                self.__parse(buf)
+        self.resolve()
+
+    def loads(self, buffer: bytes | str, encoding='utf-8'):
+        """
+        Load C&C ini from memory, as if it were read from a file.
+
+        :param buffer: the whole INI content.
+        :param encoding: text encoding, used if buffer is bytes.
+        """
+        if isinstance(buffer, (bytes, bytearray, memoryview)):
+            buffer = bytes(buffer).decode(encoding)
+        self.__parse(_universal(buffer))
+        self.resolve()
 
-    def save(self, dst: PathLike | str, encoding='utf-8',
+    def resolve(self):
+        """
+        Link sections to parents declared after them.
+
+        Loading does this, but it helps after adding sections by hand.
+        Raise ValueError if the inheritance loops.
+        """
+        for i in self._raw.values():
+            if isinstance(i.parent, str) and i.parent in self._raw:
+                i.parent = self._raw[i.parent]
+
+    def flatten(self):
+        """Cache inherited keys of every [A]:[B] section at once."""
+        for i in self._raw.values():
+            if isinstance(i.parent, INISectionClass):
+                i._inherited()
+
+    def save(self, dst: PathLike | str | IO, encoding='utf-8',
              withspace=False, blankline=1):
         """
         Save as a C&C ini.
 
-        :param dst: target ini path.
+        Files are written aside then moved onto the target,
+        so a failure halfway never leaves a broken ini.
+
+        :param dst: target ini path, or an opened file (text or binary).
+        :param encoding: text encoding.
+        :param withspace: shall we use spaces around '='?
+        :param blankline: how many lines between sections?
+        """
+        text = self.__dump(withspace, blankline)
+        if hasattr(dst, 'write'):
+            dst.write(text if isinstance(dst, io.TextIOBase)
+                      else text.encode(encoding))
+            return
+
+        dst = _path.realpath(dst)
+        tmp = f"{dst}.{uuid4().hex[:8]}.tmp"
+        try:
+            with open(tmp, 'x', encoding=encoding) as fs:
+                fs.write(text)
+            if _path.exists(dst):
+                copymode(dst, tmp)
+            replace(tmp, dst)
+        except BaseException:
+            if _path.exists(tmp):
+                remove(tmp)
+            raise
+
+    def dumps(self, encoding='utf-8', withspace=False, blankline=1):
+        """
+        Save as C&C ini bytes, the same as what save writes.
+
         :param encoding: text encoding.
         :param withspace: shall we use spaces around '='?
         :param blankline: how many lines between sections?
         """
+        return self.__dump(withspace, blankline).encode(encoding)
+
+    def __dump(self, withspace, blankline):
         _eq = ' = ' if withspace else '='
+        _gap = "\n" * (blankline + 1)
+        ret = []
+        for i in self.sections:
+            if isinstance(i, _LazySectionClass) and i.untouched:
+                # the source file might be overwritten after that.
+                i.detach()
+                ret.extend(i.rawtext())
+            elif i:
+                ret.append(f"{i.tostring()}\n")
+                items = i.items(useraw=True)
+                try:
+                    ret.append("\n".join(map(_eq.join, items)))
+                except TypeError:  # keys set as non-str, like sect[1]
+                    ret.append("\n".join(f"{k}{_eq}{v}" for k, v in items))
+                ret.append(_gap)
+            else:
+                ret.append(f"{i.tostring()}{_gap}")
+        return "".join(ret)
+
+    def __parse(self, text: str):
+        return self.__replay(self.tokenize(text))
+
+    @staticmethod
+    def tokenize(text: str):
+        """
+        Split INI text into (header, keys, values) parts.
 
-        with open(dst, 'w', encoding=encoding) as fs:
-            for i in self.sections:
-                fs.write(f"{i.tostring()}\n")
-                for key, value in i.items(useraw=True):
-                    fs.write(f"{key}{_eq}{value}\n")
-                fs.write("\n" * blankline)
-
-    def __fread(self, stream):
-        if not self._raw:
-            sections, options = [], []
-            curopt = maxopt = -1
+        The whole text gets split by headers at once, then each
+        section body is tokenized by a single findall.  The first
+        header is None, as options there go to the last loaded section.
+        """
+        parts = _HEADER.split(f"\n{text}")
+        return [(None if idx < 0 else parts[idx],
+                 *_strip(_OPTION.findall(parts[idx + 1])))
+                for idx in range(-1, len(parts) - 1, 2)]
+
+    def __replay(self, tokens):
+        raw = self._raw
+        for head, keys, values in tokens:
+            if head is None:
+                cur = next(reversed(raw.values()), None)
+                if cur is not None:
+                    self.__apply(cur, keys, values)
+                continue
+            cursect = [j.strip()[1:-1] for j in f"[{head}".split(':')]
+            cur = raw.get(cursect[0])
+            if cur is None:
+                cur = raw[cursect[0]] = INISectionClass(cursect[0])
+            # ares struct: [a]:[b]
+            if len(cursect) > 1:
+                cur.parent = raw.get(cursect[1], cursect[1])
+            self.__apply(cur, keys, values)
+
+        return len(raw)
+
+    def __index(self, buf, encoding):
+        # only headers are read, everything else stays in the buffer.
+        raw = self._raw
+        heads = [(m.start() + 1, m[1]) for m in _RAWHEADER.finditer(buf)]
+        if buf[:1] == b'[':
+            heads.insert(0, (0, _RAWFIRST.match(buf)[1]))
+        # options before any header go to the last loaded section.
+        cur = next(reversed(raw.values()), None)
+        if cur is not None:
+            preamble = buf[:heads[0][0] if heads else len(buf)]
+            self.__update(cur, f"\n{preamble.decode(encoding)}")
+
+        ends = [start for start, _ in heads[1:]] + [len(buf)]
+        for (start, head), end in zip(heads, ends):
+            cursect = [j.strip()[1:-1] for j in
+                       f"[{head.decode(encoding)}".split(':')]
+            cur = raw.get(cursect[0])
+            if cur is None:
+                cur = raw[cursect[0]] = _LazySectionClass(
+                    cursect[0], (buf, start, end), encoding, self.__update)
+            elif isinstance(cur, _LazySectionClass) and cur.untouched:
+                cur._chunks.append((buf, start, end))
+            else:
+                text = buf[start:end].decode(encoding)
+                self.__update(cur, _HEADER.split(f"\n{text}", 1)[2])
+            # ares struct: [a]:[b]
+            if len(cursect) > 1:
+                cur.parent = raw.get(cursect[1], cursect[1])
+            if isinstance(cur, _LazySectionClass) and '_map' not in vars(cur):
+                cur._head = cur.tostring()
+        return len(raw)
+
+    def __update(self, section, body: str):
+        self.__apply(section, *_strip(_OPTION.findall(body)))
+
+    def __apply(self, section, keys, values):
+        if not keys:
+            return
+        options = dict(zip(keys, values))
+        if '+' in options:
+            # ares struct: += a
+            options = {}
+            for k, v in zip(keys, values):
+                if k == '+':
+                    k = f"+{self.__diff}"
+                    self.__diff += 1
+                options[k] = v
+        if section._map:
+            section._own()
+            section._map.update(options)
+            section._cache.clear()
         else:
-            sections = list(self._raw.keys())
-            options = list(self._raw.values())
-            curopt = maxopt = len(options) - 1
-
-        while True:
-            i = stream.readline()
-            if len(i) == 0:
-                break
-            if i[0] == '[':
-                cursect = [j.strip()[1:-1] for j in
-                           i.split(';')[0].split(':')]
-                if cursect[0] in sections:
-                    curopt = sections.index(cursect[0])
-                else:
-                    sections.append(cursect[0])
-                    options.append(INISectionClass(cursect[0]))
-                    maxopt += 1
-                    curopt = maxopt
-                # ares struct: [a]:[b]
-                if len(cursect) > 1:
-                    options[curopt].parent = (
-                        options[sections.index(cursect[1])]
-                        if cursect[1] in sections else cursect[1]
-                    )
-            elif '=' in i:
-                j = i.split('=', 1)
-                if ';' not in j[0]:
-                    j[0] = j[0].strip()
-                    j[1] = j[1].split(";")[0].strip()
-                    # ares struct: += a
-                    if j[0] == '+':
-                        j[0] = f"+{self.__diff}"
-                        self.__diff += 1
-                    options[curopt].update([j])
-
-        self._raw = dict(zip(sections, options))
-        return len(sections), len(options)
+            section._map = options
+        section._invalidate()
+
+
+def _universal(text: str):
+    # what universal newlines do on files.
+    if '\r' in text:
+        return text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+def _strip(tokens):
+    # [(' Key ', ' Value ')] -> (('Key',), ('Value',))
+    if not tokens:
+        return (), ()
+    keys, values = zip(*tokens)
+    return tuple(map(str.strip, keys)), tuple(map(str.strip, values))
 
 
 class CCINIClass(INIClass):
-    def __init__(self, ccini: PathLike | str, encoding='utf-8'):
+    def __init__(self, ccini: PathLike | str, encoding='utf-8', lazy=False,
+                 cache=None):
         """
         Initialize with a given INI file.
 
         :param ccini: INI file path.
         :param encoding: text encoding.
+        :param lazy: only parse sections when they're used,
+                     see INIClass.load.
+        :param cache: a ParseCache (or True) to reuse tokens of an
+                      unchanged file, see INIClass.load.
         """
         # private props
         self.__full = _path.abspath(ccini)
@@ -291,7 +654,7 @@ class CCINIClass(INIClass):
             raise FileNotFoundError(ccini)
 
         super().__init__()
-        self.load(ccini, encoding=encoding)
+        self.load(ccini, encoding=encoding, lazy=lazy, cache=cache)
 
     def save(self, dst=None, encoding=None, withspace=False, blankline=1):
         """
@@ -0,0 +1,345 @@
+# -*- coding: utf-8 -*-
+# @Time: 2026/10/17 21:00
+# @Author: Chloride
+"""
+Westwood compressions used in map packs.
+
+- LZO1X: the general purpose one, compressing [IsoMapPack5].
+- Format80 (LCW): Westwood's own, compressing [OverlayPack] and
+  [OverlayDataPack].
+- Format5: a container splitting data into blocks of 8192 bytes,
+  each with a header of two little-endian u16 (packed size, unpacked
+  size), followed by the packed block, LZO1X by default.
+
+Base64 and line splitting of pack sections are left to the callers.
+"""
+from struct import Struct, error
+
+__all__ = ['lzo_compress', 'lzo_decompress',
+           'format80_encode', 'format80_decode',
+           'format5_encode', 'format5_decode']
+
+_BLOCK = Struct('<HH')
+_U16 = Struct('<H')
+_BLOCKSIZE = 8192
+
+_M2_MAX_OFFSET = 0x0800
+_M3_MAX_OFFSET = 0x4000
+
+
+def _copymatch(out: bytearray, dist: int, length: int):
+    # matches may overlap what they produce, which repeats a pattern.
+    start = len(out) - dist
+    if start < 0 or dist <= 0:
+        raise ValueError("Match points outside the output.")
+    if dist >= length:
+        out += out[start:start + length]
+    else:
+        pattern = out[start:]
+        out += (pattern * (length // dist + 1))[:length]
+
+
+def lzo_decompress(src: bytes, size: int = 0) -> bytes:
+    """
+    Decompress an LZO1X stream.
+
+    :param src: packed data, ending with the EOF marker.
+    :param size: expected size of the output, 0 not to check it.
+    """
+    out = bytearray()
+    ip = 0
+    # how many literals were just copied (4 for "more than 3"),
+    # which decides what a instruction below 16 means.
+    state = 0
+    try:
+        if src[0] > 17:  # the stream starts with a short literal run.
+            t = src[0] - 17
+            out += src[1:1 + t]
+            ip = 1 + t
+            state = min(t, 4)
+        while True:
+            t = src[ip]
+            ip += 1
+            if t < 16:
+                if state == 0:  # literal run
+                    if t == 0:
+                        while not src[ip]:
+                            t += 255
+                            ip += 1
+                        t += 15 + src[ip]
+                        ip += 1
+                    out += src[ip:ip + t + 3]
+                    ip += t + 3
+                    state = 4
+                    continue
+                elif state == 4:  # M1, 3 bytes after a literal run
+                    _copymatch(out, 1 + _M2_MAX_OFFSET + (t >> 2) +
+                               (src[ip] << 2), 3)
+                else:  # M1, 2 bytes after a match and its literals
+                    _copymatch(out, 1 + (t >> 2) + (src[ip] << 2), 2)
+                ip += 1
+            elif t >= 64:  # M2
+                _copymatch(out, 1 + ((t >> 2) & 7) + (src[ip] << 3),
+                           (t >> 5) + 1)
+                ip += 1
+            elif t >= 32:  # M3
+                t &= 31
+                if t == 0:
+                    while not src[ip]:
+                        t += 255
+                        ip += 1
+                    t += 31 + src[ip]
+                    ip += 1
+                _copymatch(out, 1 + (src[ip] >> 2) + (src[ip + 1] << 6),
+                           t + 2)
+                ip += 2
+            else:  # M4
+                dist = (t & 8) << 11
+                t &= 7
+                if t == 0:
+                    while not src[ip]:
+                        t += 255
+                        ip += 1
+                    t += 7 + src[ip]
+                    ip += 1
+                dist += (src[ip] >> 2) + (src[ip + 1] << 6)
+                ip += 2
+                if dist == 0:  # EOF marker
+                    break
+                _copymatch(out, dist + 0x4000, t + 2)
+            # the low 2 bits of the last but one byte tell
+            # how many literals follow the match.
+            state = src[ip - 2] & 3
+            if state:
+                out += src[ip:ip + state]
+                ip += state
+    except IndexError:
+        raise ValueError("LZO stream ends unexpectedly.") from None
+    if size and len(out) != size:
+        raise ValueError(f"LZO stream unpacks to {len(out)} bytes, "
+                         f"{size} expected.")
+    return bytes(out)
+
+
+def _putlength(out: bytearray, length: int, bits: int):
+    # lengths beyond the instruction bits are padded with zeros.
+    length -= bits
+    while length > 255:
+        out.append(0)
+        length -= 255
+    out.append(length)
+
+
+def _putliterals(out: bytearray, src: bytes, start: int, end: int):
+    count = end - start
+    if not count:
+        return
+    if not out and count <= 238:
+        out.append(count + 17)
+    elif count <= 3:
+        # carried by the low 2 bits of the previous match.
+        out[-2] |= count
+    elif count <= 18:
+        out.append(count - 3)
+    else:
+        out.append(0)
+        _putlength(out, count - 3, 15)
+    out += src[start:end]
+
+
+def lzo_compress(src: bytes) -> bytes:
+    """
+    Compress data into an LZO1X stream, decompressible by lzo1x.
+
+    Greedily matches 4-byte sequences within 16 KiB back,
+    which is what LZO1X-1 does in essence.
+    """
+    out = bytearray()
+    end = len(src)
+    last = {}
+    lit = ip = 0
+    while ip < end - 3:
+        key = src[ip:ip + 4]
+        pos = last.get(key, -1)
+        last[key] = ip
+        dist = ip - pos
+        if pos < 0 or dist > _M3_MAX_OFFSET:
+            # step faster through data which hardly compresses.
+            ip += 1 + ((ip - lit) >> 5)
+            continue
+        length = 4
+        while (ip + length < end and
+               src[pos + length:pos + length + 32] ==
+               src[ip + length:ip + length + 32]):
+            length += 32
+        while ip + length < end and src[pos + length] == src[ip + length]:
+            length += 1
+
+        _putliterals(out, src, lit, ip)
+        if length <= 8 and dist <= _M2_MAX_OFFSET:  # M2
+            out.append(((length - 1) << 5) | (((dist - 1) & 7) << 2))
+            out.append((dist - 1) >> 3)
+        else:  # M3
+            if length - 2 <= 31:
+                out.append(32 | (length - 2))
+            else:
+                out.append(32)
+                _putlength(out, length - 2, 31)
+            out.append(((dist - 1) & 63) << 2)
+            out.append((dist - 1) >> 6)
+        # index a few positions inside the match, for later ones.
+        for i in range(ip + 1, min(ip + length, end - 3), 4):
+            last[src[i:i + 4]] = i
+        ip += length
+        lit = ip
+    _putliterals(out, src, lit, end)
+    out += b'\x11\x00\x00'  # EOF marker, an M4 of distance 0.
+    return bytes(out)
+
+
+def format80_decode(src: bytes, size: int = 0) -> bytes:
+    """
+    Decompress a Format80 (LCW) stream.
+
+    :param src: packed data, mostly ending with 0x80.
+    :param size: expected size of the output, 0 not to check it.
+    """
+    out = bytearray()
+    ip, end = 0, len(src)
+    # a leading 0 makes absolute copies relative to the output end.
+    relative = end > 0 and src[0] == 0
+    ip += relative
+    try:
+        while ip < end:
+            cmd = src[ip]
+            ip += 1
+            if not cmd & 0x80:  # 0cccpppp p: short relative copy
+                _copymatch(out, ((cmd & 0x0F) << 8) | src[ip],
+                           (cmd >> 4) + 3)
+                ip += 1
+                continue
+            elif not cmd & 0x40:  # 10cccccc: literals, or the end
+                if cmd == 0x80:
+                    break
+                out += src[ip:ip + (cmd & 0x3F)]
+                ip += cmd & 0x3F
+                continue
+            elif cmd == 0xFE:  # fill: u16 count, u8 value
+                count = _U16.unpack_from(src, ip)[0]
+                out += src[ip + 2:ip + 3] * count
+                ip += 3
+                continue
+            elif cmd == 0xFF:  # long copy: u16 count, u16 position
+                count, pos = _BLOCK.unpack_from(src, ip)
+                ip += 4
+            else:  # 11cccccc: medium copy, u16 position
+                count = (cmd & 0x3F) + 3
+                pos = _U16.unpack_from(src, ip)[0]
+                ip += 2
+            _copymatch(out, pos if relative else len(out) - pos, count)
+    except (IndexError, error):
+        raise ValueError("Format80 stream ends unexpectedly.") from None
+    if size and len(out) != size:
+        raise ValueError(f"Format80 stream unpacks to {len(out)} bytes, "
+                         f"{size} expected.")
+    return bytes(out)
+
+
+def _putraw(out: bytearray, src: bytes, start: int, end: int):
+    for pos in range(start, end, 63):
+        chunk = src[pos:min(pos + 63, end)]
+        out.append(0x80 | len(chunk))
+        out += chunk
+
+
+def format80_encode(src: bytes) -> bytes:
+    """
+    Compress data into a Format80 (LCW) stream, with absolute copies.
+
+    Runs of a byte become fills, others greedy back references.
+    """
+    out = bytearray()
+    end = len(src)
+    last = {}
+    lit = ip = 0
+    while ip < end:
+        window = src[ip:ip + 0xFFFF]
+        run = len(window) - len(window.lstrip(window[:1]))
+        length, pos = 0, last.get(src[ip:ip + 3], -1)
+        if pos >= 0 and ip + 3 <= end:
+            length = 3
+            while (length < 0xFFFF and
+                   src[pos + length:pos + length + 32] ==
+                   src[ip + length:ip + length + 32]):
+                length += 32
+            while (ip + length < end and
+                   src[pos + length] == src[ip + length]):
+                length += 1
+            length = min(length, 0xFFFF)
+        if ip + 3 <= end and ip <= 0xFFFF:
+            last[src[ip:ip + 3]] = ip
+
+        if run >= 5 and run > length:
+            _putraw(out, src, lit, ip)
+            out.append(0xFE)
+            out += _U16.pack(run)
+            out.append(src[ip])
+            length = run
+        elif length >= 3:
+            _putraw(out, src, lit, ip)
+            dist = ip - pos
+            if length <= 10 and dist <= 0xFFF:
+                out.append(((length - 3) << 4) | (dist >> 8))
+                out.append(dist & 0xFF)
+            elif length <= 64:  # 0xFE and 0xFF are taken.
+                out.append(0xC0 | (length - 3))
+                out += _U16.pack(pos)
+            else:
+                out.append(0xFF)
+                out += _BLOCK.pack(length, pos)
+        else:
+            ip += 1
+            continue
+        # index a few positions inside, for later references.
+        for i in range(ip + 1, min(ip + length, end - 2, 0x10000), 4):
+            last[src[i:i + 3]] = i
+        ip += length
+        lit = ip
+    _putraw(out, src, lit, end)
+    out.append(0x80)
+    return bytes(out)
+
+
+def format5_decode(data: bytes, unpack=lzo_decompress) -> bytes:
+    """
+    Unpack all blocks of a Format5 container.
+
+    :param data: the container.
+    :param unpack: how blocks are packed, format80_decode for overlays.
+    """
+    out = []
+    pos, end = 0, len(data)
+    while pos + _BLOCK.size <= end:
+        packed, size = _BLOCK.unpack_from(data, pos)
+        pos += _BLOCK.size
+        if pos + packed > end:
+            raise ValueError("Format5 block exceeds the data.")
+        out.append(unpack(data[pos:pos + packed], size))
+        pos += packed
+    return b''.join(out)
+
+
+def format5_encode(data: bytes, pack=lzo_compress) -> bytes:
+    """
+    Pack data into a Format5 container, 8192 bytes a block.
+
+    :param data: what to pack.
+    :param pack: how blocks are packed, format80_encode for overlays.
+    """
+    out = []
+    for pos in range(0, len(data), _BLOCKSIZE):
+        block = data[pos:pos + _BLOCKSIZE]
+        packed = pack(block)
+        out.append(_BLOCK.pack(len(packed), len(block)))
+        out.append(packed)
+    return b''.join(out)
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+# @Time: 2026/10/17 20:10
+# @Author: Chloride
+"""
+Columnar views of map objects, requiring NumPy.
+
+Instead of one Python object per [Infantry], [Units], [Structures]
+or [Aircrafts] entry, an ObjectTable keeps a whole section as one
+structured array, for analytics and bulk edits like this:
+
+    units = ObjectTable.fromsection(pmap, 'Units')
+    weak = units.isin('owner', 'Soviet House') & (units['health'] < 128)
+    units['health'][weak] = 256
+    units.assign('mission', weak, 'Hunt')
+    units.save(pmap)
+
+String columns (owner, type, mission, tag, upgrades) are interned as
+int codes into per-column categories, see ObjectTable.categories.
+"""
+from typing import Iterable
+
+import numpy as np
+
+from .ccini import INIClass
+
+__all__ = ['ObjectTable', 'loadtables', 'SCHEMAS']
+
+# columns in the order they're written, with str ones as categories.
+_CATEGORY = np.int32
+SCHEMAS = {
+    'Infantry': (
+        ('owner', _CATEGORY), ('typeof', _CATEGORY), ('health', np.int16),
+        ('x', np.int16), ('y', np.int16), ('subcell', np.int16),
+        ('mission', _CATEGORY), ('facing', np.int16), ('tag', _CATEGORY),
+        ('veteran', np.int16), ('group', np.int32), ('onbridge', np.int8),
+        ('autocreate_no', np.int8), ('autocreate_yes', np.int8),
+    ),
+    'Units': (
+        ('owner', _CATEGORY), ('typeof', _CATEGORY), ('health', np.int16),
+        ('x', np.int16), ('y', np.int16), ('facing', np.int16),
+        ('mission', _CATEGORY), ('tag', _CATEGORY), ('veteran', np.int16),
+        ('group', np.int32), ('onbridge', np.int8), ('followid', np.int32),
+        ('autocreate_no', np.int8), ('autocreate_yes', np.int8),
+    ),
+    'Aircrafts': (
+        ('owner', _CATEGORY), ('typeof', _CATEGORY), ('health', np.int16),
+        ('x', np.int16), ('y', np.int16), ('facing', np.int16),
+        ('mission', _CATEGORY), ('tag', _CATEGORY), ('veteran', np.int16),
+        ('group', np.int32),
+        ('autocreate_no', np.int8), ('autocreate_yes', np.int8),
+    ),
+    'Structures': (
+        ('owner', _CATEGORY), ('typeof', _CATEGORY), ('health', np.int16),
+        ('x', np.int16), ('y', np.int16), ('facing', np.int16),
+        ('tag', _CATEGORY), ('ai_sellable', np.int8),
+        ('ai_rebuildable', np.int8), ('powered', np.int8),
+        ('upgrades', np.int16), ('spotlight', np.int16),
+        ('upgrade1', _CATEGORY), ('upgrade2', _CATEGORY),
+        ('upgrade3', _CATEGORY), ('ai_repair', np.int8),
+        ('norminal', np.int8),
+    ),
+}
+# MapClass collections built from these sections.
+_COLLECTIONS = {'Infantry': 'infantries', 'Units': 'units',
+                'Aircrafts': 'aircrafts', 'Structures': 'buildings'}
+
+
+class ObjectTable:
+    """One section of map objects, as a structured array."""
+
+    def __init__(self, kind: str, values: Iterable[str] = ()):
+        """
+        :param kind: section name, one of SCHEMAS.
+        :param values: raw entries of that section.
+        """
+        if kind not in SCHEMAS:
+            raise KeyError(f'No columnar schema for [{kind}].')
+        self.kind = kind
+        self.schema = SCHEMAS[kind]
+        self.categories: dict[str, np.ndarray] = {}
+        values = list(values)
+        width = len(self.schema)
+        fields = ",".join(values).split(",") if values else []
+        if len(fields) != len(values) * width:
+            bad = next(i for i in values if i.count(',') != width - 1)
+            raise ValueError(f'Malformed entry in [{kind}]: "{bad}".')
+        fields = np.array(fields, dtype=str).reshape(len(values), width)
+
+        self.data = np.empty(len(values), dtype=list(self.schema))
+        for idx, (name, dtype) in enumerate(self.schema):
+            if dtype is _CATEGORY:
+                self.categories[name], self.data[name] = np.unique(
+                    fields[:, idx], return_inverse=True)
+            else:
+                self.data[name] = fields[:, idx].astype(dtype)
+
+    @classmethod
+    def fromsection(cls, pini: INIClass, kind: str):
+        """
+        Build a table from pini[kind], or an empty one without it.
+
+        Maps get synced first, so that edits of their collections
+        are there.
+        """
+        if hasattr(pini, 'sync'):
+            pini.sync()
+        return cls(kind, pini.getsection(kind).values(useraw=True))
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, column):
+        # a view, so that 'table["health"][mask] = 256' edits in place.
+        return self.data[column]
+
+    def __setitem__(self, column, value):
+        self.data[column] = value
+
+    def __repr__(self):
+        return f'ObjectTable [{self.kind}] ({len(self)} objects)'
+
+    def code(self, column, value: str):
+        """Code of value in a str column, or -1 if never used."""
+        cats = self.categories[column]
+        idx = np.searchsorted(cats, value)
+        return int(idx) if idx < len(cats) and cats[idx] == value else -1
+
+    def decode(self, column):
+        """Values of a str column as a str array."""
+        return self.categories[column][self.data[column]]
+
+    def isin(self, column, *values: str):
+        """Mask of rows whose str column equals any of values."""
+        codes = [self.code(column, i) for i in values]
+        return np.isin(self.data[column], [i for i in codes if i >= 0])
+
+    def assign(self, column, mask, value: str):
+        """Set a str column to value on rows picked by mask."""
+        idx = self.code(column, value)
+        if idx < 0:
+            self._recode(column, np.append(self.categories[column], value))
+            idx = self.code(column, value)
+        self.data[column][mask] = idx
+
+    def select(self, mask):
+        """A new table of rows picked by mask (or indexes)."""
+        ret = object.__new__(type(self))
+        ret.kind = self.kind
+        ret.schema = self.schema
+        ret.categories = self.categories.copy()
+        ret.data = self.data[mask]
+        return ret
+
+    def _recode(self, column, values):
+        # keep categories sorted, for searchsorted in code().
+        cats, inverse = np.unique(values, return_inverse=True)
+        old = self.categories.get(column)
+        if old is not None and len(self.data):
+            self.data[column] = inverse[self.data[column]]
+        self.categories[column] = cats
+
+    @classmethod
+    def concat(cls, tables: Iterable['ObjectTable']):
+        """Stack tables of the same kind, e.g. across a map corpus."""
+        tables = list(tables)
+        if not tables:
+            raise ValueError('Nothing to concat.')
+        ret = object.__new__(cls)
+        ret.kind = tables[0].kind
+        ret.schema = tables[0].schema
+        if any(i.kind != ret.kind for i in tables):
+            raise ValueError('Tables of different kinds.')
+        ret.categories = {}
+        ret.data = np.concatenate([i.data for i in tables])
+        for name, dtype in ret.schema:
+            if dtype is not _CATEGORY:
+                continue
+            ret.categories[name], inverse = np.unique(
+                np.concatenate([i.categories[name] for i in tables]),
+                return_inverse=True)
+            # shift codes of each table into the merged categories.
+            start, offset = 0, 0
+            for i in tables:
+                end = start + len(i)
+                ret.data[name][start:end] = inverse[offset + i.data[name]]
+                start, offset = end, offset + len(i.categories[name])
+        return ret
+
+    def tostrings(self):
+        """Entries as section values, in the order of rows."""
+        cols = [(self.categories[name][self.data[name]]
+                 if dtype is _CATEGORY else self.data[name]).tolist()
+                for name, dtype in self.schema]
+        return [",".join(map(str, row)) for row in zip(*cols)]
+
+    def apply(self):
+        return {str(idx): value
+                for idx, value in enumerate(self.tostrings())}
+
+    def save(self, pini: INIClass):
+        """
+        Write rows back into pini[kind].
+
+        If pini is a MapClass, it gets synced first, then its typed
+        collection of this kind gets dropped, to be rebuilt from the
+        new section on use.
+        """
+        if hasattr(pini, 'sync'):
+            # other collections keep their edits, this one is replaced.
+            pini.sync()
+        pini.addnew(self.kind)
+        pini[self.kind] = self.apply()
+        vars(pini).pop(_COLLECTIONS[self.kind], None)
+
+
+def loadtables(pini: INIClass):
+    """Tables of all object sections, keyed by section name."""
+    return {kind: ObjectTable.fromsection(pini, kind) for kind in SCHEMAS}
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+# @Time: 2026/10/18 4:30
+# @Author: Chloride
+"""
+Bulk cell transforms of positioned map objects, requiring NumPy.
+
+A CellTransform maps cell (x, y) to another cell affinely.
+transform() applies one to waypoints, terrains, celltags, smudges,
+infantries, units, buildings and aircrafts at once, turning facings
+along, and tells which objects got off the map:
+
+    flip = mirror(pmap, 'vertical')        # left <-> right on screen
+    offmap = transform(pmap, flip, foundations=loadfoundations(art))
+    offmap['units']                        # bool mask of [Units]
+
+Cells are isometric: x - y runs across the screen, x + y down it.
+For a map of [Map] Size=0,0,W,H, cells in it have
+W < x + y <= W + 2H and |x - y| < W, see inside().
+
+Over [Map] Size, mirroring left and right is exact.  Top and bottom
+can't be, as a cell row is half a cell lower than its neighbours, so
+mirror(..., 'horizontal') and rotate180() move objects by half a row
+as well, and the last row of cells leaves the map.  Over LocalSize,
+which isn't symmetric on the grid, some cells at its edges leave it
+whatever the axis (0.4% of awither.map).  transform() reports
+objects landing off area either way, and removes waypoints, terrains
+and celltags their coordinates can't be written for.
+
+Foundations can't turn, so a building of a non-square foundation
+keeps its width x height, anchored at the top cell of its mirrored
+footprint, covering some other cells than that footprint.
+
+Sections are rewritten in place, and built collections of them
+dropped, to be rebuilt on use, like ObjectTable.save does.
+Tiles and overlays are not touched, see relertpy.mappack.
+"""
+from math import pi
+from typing import Iterable, Mapping, NamedTuple
+
+import numpy as np
+
+from .ccini import INIClass
+from .columnar import ObjectTable
+from .spatial import KINDS
+
+__all__ = ['CellTransform', 'transform', 'translate', 'mirror',
+           'rotate180', 'inside']
+
+# collection -> section.
+_SECTIONS = {'waypoints': 'Waypoints', 'terrains': 'Terrain',
+             'celltags': 'CellTags', 'smudges': 'Smudge',
+             'infantries': 'Infantry', 'units': 'Units',
+             'buildings': 'Structures', 'aircrafts': 'Aircrafts'}
+_TABLES = frozenset(('infantries', 'units', 'buildings', 'aircrafts'))
+_SMUDGEWIDTH = 4
+_FACING = 2 * pi / 256  # facings are 0-255, clockwise from north (y - 1)
+
+
+class CellTransform(NamedTuple):
+    """(x, y) -> (xx * x + xy * y + dx, yx * x + yy * y + dy)."""
+    xx: int = 1
+    xy: int = 0
+    yx: int = 0
+    yy: int = 1
+    dx: int = 0
+    dy: int = 0
+
+    def __call__(self, x, y):
+        """Transform cells, x and y being ints or arrays."""
+        return (self.xx * x + self.xy * y + self.dx,
+                self.yx * x + self.yy * y + self.dy)
+
+    def then(self, other: 'CellTransform'):
+        """This one followed by other."""
+        return CellTransform(
+            other.xx * self.xx + other.xy * self.yx,
+            other.xx * self.xy + other.xy * self.yy,
+            other.yx * self.xx + other.yy * self.yx,
+            other.yx * self.xy + other.yy * self.yy,
+            *other(self.dx, self.dy))
+
+    def facings(self, values):
+        """Turn facings (0-255) the way directions get transformed."""
+        values = np.asarray(values)
+        angle = values * _FACING
+        vx, vy = np.sin(angle), -np.cos(angle)
+        nx = self.xx * vx + self.xy * vy
+        ny = self.yx * vx + self.yy * vy
+        ret = np.rint(np.arctan2(nx, -ny) / _FACING) % 256
+        return ret.astype(values.dtype)
+
+    def corner(self, width, height):
+        """
+        Offset of the new top cell of width x height foundations.
+
+        Objects of foundations keep their top (least x and y) cell,
+        which isn't the top one any more after mirroring.  Width and
+        height may swap in the footprint, but the foundation can't,
+        so non-square ones cover other cells, see the module docs.
+        """
+        width, height = np.asarray(width) - 1, np.asarray(height) - 1
+        return (np.minimum(0, self.xx * width) +
+                np.minimum(0, self.xy * height),
+                np.minimum(0, self.yx * width) +
+                np.minimum(0, self.yy * height))
+
+
+def _rect(pmap: INIClass, area):
+    if area not in ('Size', 'LocalSize'):
+        raise ValueError(f"Unknown area: {area}.")
+    return tuple(int(i) for i in pmap.getvalue('Map', area))
+
+
+def translate(dx: int, dy: int) -> CellTransform:
+    return CellTransform(dx=dx, dy=dy)
+
+
+def mirror(pmap: INIClass, axis='vertical', area='Size'):
+    """
+    Mirror cells over a screen axis through the center of area.
+
+    Exact for 'vertical' over Size only, and foundations don't turn,
+    see the module docs.
+
+    :param axis: 'vertical' swaps left and right,
+                 'horizontal' swaps top and bottom.
+    :param area: 'Size' or 'LocalSize' of [Map].
+    """
+    width = _rect(pmap, 'Size')[2]
+    left, top, w, h = _rect(pmap, area)
+    if axis == 'vertical':
+        shift = 2 * left + w - width
+        return CellTransform(0, 1, 1, 0, shift, -shift)
+    if axis == 'horizontal':
+        middle = width + 2 * top + h + 1
+        return CellTransform(0, -1, -1, 0, middle, middle)
+    raise ValueError(f"Unknown axis: {axis}.")
+
+
+def rotate180(pmap: INIClass, area='Size'):
+    """
+    Rotate cells around the center of area, see mirror.
+
+    Off by half a row, and the last row leaves the map.
+    """
+    return mirror(pmap, 'vertical', area).then(
+        mirror(pmap, 'horizontal', area))
+
+
+def inside(pmap: INIClass, x, y, area='Size'):
+    """
+    Mask of cells inside area of [Map].
+
+    'Size' tells cells the map has at all, 'LocalSize' those
+    visible in game, by their columns and half-cell rows.
+    """
+    x, y = np.asarray(x), np.asarray(y)
+    width, height = _rect(pmap, 'Size')[2:]
+    if area == 'Size':
+        return ((x + y > width) & (x + y <= width + 2 * height) &
+                (np.abs(x - y) < width))
+    left, top, w, h = _rect(pmap, area)
+    column = (x - y + width - 1) // 2
+    row = (x + y - width - 1) // 2
+    return ((column >= left) & (column < left + w) &
+            (row >= top) & (row < top + h))
+
+
+def _coords(values):
+    values = np.fromiter(map(int, values), np.int64, len(values))
+    return values % 1000, values // 1000
+
+
+def _joined(x, y):
+    return (y * 1000 + x).astype(str).tolist()
+
+
+def _sizes(types, foundations):
+    # width and height of each type, 1x1 for those unknown.
+    sizes = np.array([foundations.get(i, (1, 1)) for i in types.tolist()],
+                     np.int64).reshape(-1, 2)
+    return sizes[:, 0], sizes[:, 1]
+
+
+def transform(pmap: INIClass, cells: CellTransform, *,
+              kinds: Iterable[str] = KINDS, foundations: Mapping = None,
+              area='Size', drop=False) -> dict[str, np.ndarray]:
+    """
+    Move positioned objects of pmap by cells, in place.
+
+    All coordinates go through cells as one array, so the cost
+    is a few passes over the sections rather than per object.
+
+    :param kinds: collections to move, see spatial.KINDS.
+    :param foundations: type -> (width, height) of buildings
+                        and smudges, see spatial.loadfoundations.
+    :param area: where objects should end up, 'Size' or 'LocalSize'.
+    :param drop: remove objects off area, instead of flagging only.
+                 Waypoints, terrains and celltags landing on negative
+                 cells (or x over 999) get removed anyway, as their
+                 y * 1000 + x keys can't be told apart.
+    :return: {kind: mask of objects off area}, in the order of
+             their sections, before dropping.
+    """
+    kinds = list(dict.fromkeys(kinds))
+    if any(i not in _SECTIONS for i in kinds):
+        raise KeyError(f'Not positioned: {set(kinds) - _SECTIONS.keys()}.')
+    foundations = foundations or {}
+    if hasattr(pmap, 'sync'):
+        pmap.sync()
+
+    # parse, gathering all coordinates (and corners) of all kinds.
+    parsed, xs, ys, ox, oy = {}, [], [], [], []
+    for kind in kinds:
+        sect = pmap.getsection(_SECTIONS[kind])
+        if kind in _TABLES:
+            src = ObjectTable.fromsection(pmap, sect.section)
+            x, y = src['x'].astype(np.int64), src['y'].astype(np.int64)
+            types = src.decode('typeof')
+        elif kind == 'smudges':
+            src = list(sect.values(useraw=True))
+            fields = ",".join(src).split(",") if src else []
+            if len(fields) != len(src) * _SMUDGEWIDTH:
+                raise ValueError('Malformed entry in [Smudge].')
+            src = np.array(fields, dtype=str).reshape(-1, _SMUDGEWIDTH)
+            x, y = src[:, 1].astype(np.int64), src[:, 2].astype(np.int64)
+            types = src[:, 0]
+        else:
+            src = list(sect.items(useraw=True))
+            x, y = _coords([v if kind == 'waypoints' else k for k, v in src])
+            types = None
+        if types is not None and foundations:
+            offset = cells.corner(*_sizes(types, foundations))
+        else:
+            offset = (0, 0)
+        parsed[kind] = src
+        xs.append(x)
+        ys.append(y)
+        ox.append(np.broadcast_to(offset[0], x.shape))
+        oy.append(np.broadcast_to(offset[1], y.shape))
+
+    x, y = cells(np.concatenate(xs or [[]]).astype(np.int64),
+                 np.concatenate(ys or [[]]).astype(np.int64))
+    x = x + np.concatenate(ox or [[]]).astype(np.int64)
+    y = y + np.concatenate(oy or [[]]).astype(np.int64)
+    valid = inside(pmap, x, y, area)
+
+    # write back, kind by kind.
+    ret = {}
+    bounds = np.cumsum([0] + [len(i) for i in xs])
+    for kind, start, end in zip(kinds, bounds, bounds[1:]):
+        src, keep = parsed[kind], valid[start:end]
+        nx, ny = x[start:end], y[start:end]
+        ret[kind] = ~keep
+        name = _SECTIONS[kind]
+        if kind in _TABLES:
+            src['x'], src['y'] = nx, ny
+            src['facing'] = cells.facings(src['facing'])
+            (src.select(keep) if drop else src).save(pmap)
+        else:
+            if kind == 'smudges':
+                src[:, 1], src[:, 2] = nx, ny
+                options = {str(i): ",".join(v)
+                           for i, v in enumerate(src.tolist())}
+            else:
+                # y * 1000 + x can't tell cells off its range apart.
+                fits = (nx >= 0) & (nx < 1000) & (ny >= 0)
+                src = [i for i, j in zip(src, fits) if j]
+                keep, nx, ny = keep[fits], nx[fits], ny[fits]
+                if kind == 'waypoints':
+                    options = dict(zip((k for k, _ in src),
+                                       _joined(nx, ny)))
+                else:
+                    options = dict(zip(_joined(nx, ny), (v for _, v in src)))
+            if drop:
+                options = {k: v for (k, v), i in zip(options.items(), keep)
+                           if i}
+                if kind == 'smudges':
+                    options = dict(enumerate(options.values()))
+            pmap.addnew(name)
+            pmap[name] = options
+            vars(pmap).pop(kind, None)
+    return ret
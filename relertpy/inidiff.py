@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+# @Time: 2026/10/18 3:00
+# @Author: Chloride
+"""
+Structural diff and patch of INIs and maps.
+
+A patch is a plain dict, compact as JSON:
+
+    {'added': {section: {'parent': str | None, 'options': {k: v}}},
+     'removed': [section, ...],
+     'changed': {section: {'set': {k: v}, 'unset': [k],
+                           'old': {k: v | None}, 'parent': [old, new]}}}
+
+'old' keeps what the keys were, so that applying a patch to a third
+INI could tell conflicts, and 'parent' is only there if it changed:
+
+    patch = diff(before, after)
+    conflicts = apply(other, patch)
+    open('edit.json', 'w').write(dumps(patch))
+
+Sections are compared as whole first, so the cost is linear in size.
+Sections cloned and never written share options, see INIClass.clone,
+and untouched lazy ones are compared by raw text, neither is parsed.
+
+For maps, diffobjects() tells which objects changed, like a unit
+moved or actions of a trigger, for review rather than patching.
+"""
+import json
+from collections import Counter
+from typing import Iterable
+
+from .ccini import INIClass, INISectionClass, _LazySectionClass
+
+__all__ = ['diff', 'apply', 'dumps', 'loads', 'diffobjects',
+           'OBJECTKINDS']
+
+OBJECTKINDS = ('triggers', 'tags', 'aitriggers', 'teams', 'scripts',
+               'taskforces', 'localvars', 'waypoints', 'celltags',
+               'terrains', 'smudges', 'infantries', 'units',
+               'buildings', 'aircrafts')
+
+
+def _parent(section: INISectionClass):
+    return None if section.parent is None else str(section.parent)
+
+
+def _same(a: INISectionClass, b: INISectionClass):
+    if _parent(a) != _parent(b):
+        return False
+    if (isinstance(a, _LazySectionClass) and a.untouched and
+            isinstance(b, _LazySectionClass) and b.untouched and
+            list(a.rawtext()) == list(b.rawtext())):
+        return True
+    return a._map is b._map or a._map == b._map
+
+
+def _sync(ini):
+    # collections of maps keep changes of their own until synced.
+    if hasattr(ini, 'sync'):
+        ini.sync()
+
+
+def diff(a: INIClass, b: INIClass) -> dict:
+    """The patch turning a into b, syncing maps first."""
+    _sync(a)
+    _sync(b)
+    added, changed = {}, {}
+    removed = [i for i in a if not b.hassection(i)]
+    for name in b:
+        new = b[name]
+        if not a.hassection(name):
+            added[name] = {'parent': _parent(new),
+                           'options': dict(new.items(useraw=True))}
+            continue
+        old = a[name]
+        if _same(old, new):
+            continue
+        src, dst = old._map, new._map
+        entry = {
+            'set': {k: v for k, v in dst.items() if src.get(k) != v},
+            'unset': [k for k in src if k not in dst],
+        }
+        changes = (*entry['set'], *entry['unset'])
+        entry['old'] = {k: src.get(k) for k in changes}
+        if _parent(old) != _parent(new):
+            entry['parent'] = [_parent(old), _parent(new)]
+        changed[name] = entry
+    return {'added': added, 'removed': removed, 'changed': changed}
+
+
+def _conflicts(target: INIClass, patch: dict):
+    ret = []
+    for name in patch['added']:
+        if target.hassection(name):
+            ret.append((name, None, None, 'exists'))
+    for name in patch['removed']:
+        if not target.hassection(name):
+            ret.append((name, None, 'exists', None))
+    for name, entry in patch['changed'].items():
+        if not target.hassection(name):
+            ret.append((name, None, 'exists', None))
+            continue
+        sect = target[name]
+        own = sect._map
+        for k, v in entry['old'].items():
+            actual = own.get(k)
+            # nothing to worry if it's already what the patch wants.
+            if actual != v and actual != entry['set'].get(k):
+                ret.append((name, k, v, actual))
+        if 'parent' in entry and _parent(sect) not in entry['parent']:
+            ret.append((name, ':', entry['parent'][0], _parent(sect)))
+    return ret
+
+
+def apply(target: INIClass, patch: dict, *, strict=False):
+    """
+    Apply a patch in place, even onto an INI it didn't come from.
+
+    Conflicts are where target differs from what the patch expects,
+    as (section, key, expected, actual), key being None for sections
+    and ':' for parents.
+
+    :param strict: raise ValueError on conflicts, changing nothing.
+                   Otherwise the patch wins and conflicts are returned.
+    """
+    conflicts = _conflicts(target, patch)
+    if strict and conflicts:
+        raise ValueError(f"{len(conflicts)} conflicts, "
+                         f"the first one: {conflicts[0]}")
+    for name in patch['removed']:
+        target.remove(name)
+    for name, entry in patch['added'].items():
+        target.addnew(name)
+        target[name] = entry['options']
+        target[name].parent = entry['parent']
+    for name, entry in patch['changed'].items():
+        target.addnew(name)
+        sect = target[name]
+        for k in entry['unset']:
+            if k in sect:
+                del sect[k]
+        for k, v in entry['set'].items():
+            sect[k] = v
+        if 'parent' in entry:
+            sect.parent = entry['parent'][1]
+    # parents given by name get linked here.
+    target.resolve()
+    return conflicts
+
+
+def dumps(patch: dict) -> str:
+    return json.dumps(patch, ensure_ascii=False, separators=(',', ':'))
+
+
+def loads(text: str) -> dict:
+    return json.loads(text)
+
+
+def _key(kind, obj):
+    if kind in ('teams', 'scripts', 'taskforces'):
+        return obj.section
+    if kind == 'waypoints':
+        return obj.pid
+    if kind == 'localvars':
+        return obj.name
+    return obj.id
+
+
+def _fields(obj):
+    # public attributes of map objects, as comparable values.
+    if isinstance(obj, INISectionClass):
+        ret = dict(obj.items(useraw=True))
+    else:
+        attrs, slots = obj.__getstate__()
+        ret = {k: v for k, v in {**(attrs or {}), **slots}.items()
+               if k[0] != '_'}
+        if isinstance(obj, Iterable):  # coordinates and AI triggers
+            ret['[]'] = list(obj)
+    return {k: [str(i) for i in v] if isinstance(v, Iterable) and
+            not isinstance(v, str) else v for k, v in ret.items()}
+
+
+def _changes(a, b):
+    fa, fb = _fields(a), _fields(b)
+    return {k: (fa.get(k), fb.get(k)) for k in fa.keys() | fb.keys()
+            if fa.get(k) != fb.get(k)}
+
+
+def _text(obj):
+    if isinstance(obj, INISectionClass):
+        return repr(sorted(obj.items(useraw=True)))
+    value = obj.apply()
+    return value if isinstance(value, str) else ",".join(map(str, value))
+
+
+def diffobjects(a, b, kinds: Iterable[str] = OBJECTKINDS) -> dict:
+    """
+    Objects added, removed and changed between two maps.
+
+    Logics are matched by ID, cell objects (having no ID) by their
+    owner and type, for those not identical, in order.
+
+    :return: {kind: {'added': [obj], 'removed': [obj],
+                     'changed': [(old, new, {field: (old, new)})]}}
+    """
+    ret = {}
+    for kind in kinds:
+        src, dst = getattr(a, kind), getattr(b, kind)
+        added, removed, changed = [], [], []
+        if kind in ('infantries', 'units', 'buildings', 'aircrafts',
+                    'smudges', 'terrains', 'celltags'):
+            same = Counter(map(_text, src)) & Counter(map(_text, dst))
+            left, right = Counter(same), Counter(same)
+            olds = [i for i in src if not _take(left, _text(i))]
+            pending = {}
+            for i in olds:
+                pending.setdefault(_kind(i), []).append(i)
+            for i in dst:
+                if _take(right, _text(i)):
+                    continue
+                group = pending.get(_kind(i))
+                if group:
+                    old = group.pop(0)
+                    changed.append((old, i, _changes(old, i)))
+                else:
+                    added.append(i)
+            removed = [j for i in pending.values() for j in i]
+        else:
+            olds = {_key(kind, i): i for i in src}
+            news = {_key(kind, i): i for i in dst}
+            removed = [v for k, v in olds.items() if k not in news]
+            for k, v in news.items():
+                if k not in olds:
+                    added.append(v)
+                elif _text(olds[k]) != _text(v) or kind == 'triggers':
+                    fields = _changes(olds[k], v)
+                    if fields:
+                        changed.append((olds[k], v, fields))
+        if added or removed or changed:
+            ret[kind] = {'added': added, 'removed': removed,
+                         'changed': changed}
+    return ret
+
+
+def _take(counter, key):
+    if counter[key] > 0:
+        counter[key] -= 1
+        return True
+    return False
+
+
+def _kind(obj):
+    return getattr(obj, 'owner', None), getattr(obj, 'typeof', None)
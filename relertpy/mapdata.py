@@ -1,13 +1,16 @@
 # -*- coding: utf-8 -*-
 # @Time: 2022/04/22 0:17
 # @Author: Chloride
+from functools import cached_property
 from os import PathLike
 from types import MappingProxyType
-from uuid import uuid4
 
 from . import structs as meta
 from .ccini import CCINIClass
-from .types import Bool
+from .refgraph import ReferenceGraph
+from .regids import IDAllocator
+from .spatial import SpatialIndex
+from .types import Bool, TrackedList
 
 __all__ = ['MapClass']
 
@@ -17,76 +20,165 @@ class MapClass(CCINIClass):
     RA2 (and/or YR, within mods) MAP Structure.
     """
 
-    def __init__(self, pathref: PathLike | str, encoding='ansi'):
+    def __init__(self, pathref: PathLike | str, encoding='ansi', lazy=False,
+                 cache=None):
         """
         Initialize a MAP instance.
 
         :param pathref: map file (*.map, *.mpr, *.yrm) source.
         :param encoding: FA2 using ANSI, while Relert Sharp using UTF-8.
+        :param lazy: leave sections like [IsoMapPack5] unparsed
+                     until they're used, see INIClass.load.
+        :param cache: a ParseCache (or True) to skip tokenizing
+                      the map again once it's cached.
         """
-        super().__init__(pathref, encoding)
-
-        def _getreg(_meta, _section: str, *,
-                    rp_origin=True, iniptr=False):
-            ti = []
-            for i in self.gettypelist(_section):
-                ti.append(
-                    _meta(self, i) if iniptr else
-                    _meta(i, source=dict(self[i].items(useraw=True)))
-                )
-                if rp_origin:
-                    self[i] = ti[-1]
-            return ti
-
-        def _gettype(_meta, _sect: str, *,
-                     raw=False, pair=False, iniptr=False):
-            return (
-                [_meta(*((self, i) if iniptr else (i,)))
-                 for i in self.getsection(_sect).items(useraw=raw)]
-                if pair else
-                [_meta(*((self, i) if iniptr else (i,)))
-                 for i in self.getsection(_sect).values(useraw=raw)]
-            )
-
-        self.waypoints = _gettype(meta.Waypoint, 'Waypoints',
-                                  raw=True, pair=True)
-        self.terrains = _gettype(meta.Terrain, 'Terrain',
-                                 raw=True, pair=True)
-        self.celltags = _gettype(meta.CellTag, 'CellTags',
-                                 raw=True, pair=True)
-        self.smudges = _gettype(meta.Smudge, 'Smudge')
-
-        self.taskforces = _getreg(meta.TaskForce, 'TaskForces')
-        self.scripts = _getreg(meta.Script, 'ScriptTypes')
-        self.teams = _getreg(meta.Team, 'TeamTypes')
-        self.aitriggers = _gettype(meta.AITrigger, 'AITriggerTypes',
-                                   pair=True)
-
-        self.triggers = _gettype(meta.Trigger, 'Triggers',
-                                 pair=True, iniptr=True)
-        self.tags = _gettype(meta.Tag, 'Tags', pair=True)
-        self.localvars = _gettype(meta.LocalVar, 'VariableNames')
-
-        self.houses = (
-            {idx: f'<Player @ {chr(loc)}>'
-             for idx, loc in zip(range(4475, 4483), range(65, 73))}
-            if self.ismultiplay else
-            _getreg(meta.House, 'Houses', iniptr=True)
+        super().__init__(pathref, encoding, lazy, cache)
+
+    # collections are built on first access, and they're TrackedLists
+    # so that save could skip those which haven't been changed.
+    # objects split raw values themselves, rather than leaving
+    # a parsed copy of every entry in the section cache.
+    def _getreg(self, _meta, _section: str, *, iniptr=False):
+        ti = []
+        for i in self.gettypelist(_section):
+            if not self.hassection(i):
+                continue
+            origin = self._raw[i]
+            reg = (_meta(self, i) if iniptr else
+                   _meta(i, source=dict(origin.items(useraw=True))))
+            # the wrapper takes the place of the origin section,
+            # so that editing it is editing the map.
+            reg.parent = origin.parent
+            for child in list((origin._children or {}).values()):
+                child.parent = reg
+            self._raw[i] = reg
+            ti.append(reg)
+        return TrackedList(ti)
+
+    def _gettype(self, _meta, _sect: str, *,
+                 raw=False, pair=False, iniptr=False):
+        src = self.getsection(_sect)
+        src = src.items(useraw=raw) if pair else src.values(useraw=raw)
+        return TrackedList(
+            [_meta(self, i) for i in src] if iniptr else
+            [_meta(i) for i in src]
         )
-        self.countries = _getreg(meta.Country, 'Countries',
-                                 iniptr=True)
 
-        self.infantries = _gettype(meta.Infantry.fromvalue, 'Infantry')
-        self.units = _gettype(meta.Vehicle.fromvalue, 'Units')
-        self.buildings = _gettype(meta.Building.loadbuilding,
-                                  'Structures')
-        self.aircrafts = _gettype(meta.Aircraft.fromvalue, 'Aircrafts')
+    @cached_property
+    def waypoints(self):
+        return self._gettype(meta.Waypoint, 'Waypoints',
+                             raw=True, pair=True)
+
+    @cached_property
+    def terrains(self):
+        return self._gettype(meta.Terrain, 'Terrain', raw=True, pair=True)
+
+    @cached_property
+    def celltags(self):
+        return self._gettype(meta.CellTag, 'CellTags', raw=True, pair=True)
+
+    @cached_property
+    def smudges(self):
+        return self._gettype(meta.Smudge, 'Smudge', raw=True)
+
+    @cached_property
+    def taskforces(self):
+        return self._getreg(meta.TaskForce, 'TaskForces')
+
+    @cached_property
+    def scripts(self):
+        return self._getreg(meta.Script, 'ScriptTypes')
+
+    @cached_property
+    def teams(self):
+        return self._getreg(meta.Team, 'TeamTypes')
+
+    @cached_property
+    def aitriggers(self):
+        return self._gettype(meta.AITrigger, 'AITriggerTypes', pair=True)
+
+    @cached_property
+    def triggers(self):
+        # [Events] and [Actions] are read as raw text at once,
+        # instead of parsing an Array per trigger.
+        events = self.getsection('Events')
+        actions = self.getsection('Actions')
+        return TrackedList([
+            meta.Trigger(self, (i, v),
+                         events.get(i, '0'), actions.get(i, '0'))
+            for i, v in self.getsection('Triggers').items(useraw=True)
+        ])
+
+    @cached_property
+    def tags(self):
+        return self._gettype(meta.Tag, 'Tags', raw=True, pair=True)
+
+    @cached_property
+    def localvars(self):
+        return self._gettype(meta.LocalVar, 'VariableNames', raw=True)
+
+    @cached_property
+    def houses(self):
+        if self.ismultiplay:
+            return {idx: f'<Player @ {chr(loc)}>'
+                    for idx, loc in zip(range(4475, 4483), range(65, 73))}
+        return self._getreg(meta.House, 'Houses', iniptr=True)
+
+    @cached_property
+    def countries(self):
+        return self._getreg(meta.Country, 'Countries', iniptr=True)
+
+    @cached_property
+    def infantries(self):
+        return self._gettype(meta.Infantry.fromvalue, 'Infantry',
+                             raw=True)
+
+    @cached_property
+    def units(self):
+        return self._gettype(meta.Vehicle.fromvalue, 'Units', raw=True)
+
+    @cached_property
+    def buildings(self):
+        return self._gettype(meta.Building.loadbuilding, 'Structures',
+                             raw=True)
+
+    @cached_property
+    def aircrafts(self):
+        return self._gettype(meta.Aircraft.fromvalue, 'Aircrafts',
+                             raw=True)
+
+    @cached_property
+    def spatial(self):
+        """Objects by cells, see SpatialIndex for building foundations."""
+        return SpatialIndex(self)
+
+    @cached_property
+    def references(self):
+        """Who refers to which logics, see ReferenceGraph."""
+        return ReferenceGraph(self)
+
+    def clone(self):
+        """
+        A copy of the map sharing unchanged sections with this one.
+
+        Changes of collections are synced into sections first.
+        The copy builds its own collections when they're used,
+        from the shared sections, see INIClass.clone.
+        """
+        self.sync()
+        ret = super().clone()
+        for i in list(vars(ret)):
+            if isinstance(getattr(type(ret), i, None), cached_property):
+                del vars(ret)[i]
+        return ret
 
-    def getfreeregid(self):
-        while True:
-            idx = "%08s-G" % str(uuid4()).split("-")[0].upper()
-            if not self.hassection(idx):
-                return idx
+    @cached_property
+    def regids(self):
+        """IDs in use by logics and fresh ones, see IDAllocator."""
+        return IDAllocator(self)
+
+    def getfreeregid(self, style='G'):
+        return self.regids.next(style)
 
     # global settings
     @property
@@ -158,61 +250,91 @@ class MapClass(CCINIClass):
         :param withspace: shall we use spaces around '='?
         :param blankline: how many lines between sections?
         """
+        self.sync()
+        super().save(dst, encoding, withspace, blankline)
+
+    def sync(self):
+        """
+        Write changed collections back into their sections.
+
+        save does this, while it also helps before reading
+        the sections directly, like dumps or clone.
+        """
         # the sections wouldn't allow repeat values,
         # since in game it'll pick the first one among them.
         # as for keys, should be the last one.
 
         # inline functions making the process little tidier.
+        # only collections built and changed since loaded (or last
+        # saved) are written back, the others stay as they are.
+        _built = vars(self).get
+
+        def _changed(_src):
+            if _src is None:
+                return False
+            return not isinstance(_src, TrackedList) or _src.dirty
+
+        def _write(_src, _sect: str, _data):
+            self.addnew(_sect)
+            self[_sect] = _data
+            if isinstance(_src, TrackedList):
+                _src.dirty = False
+
+        # every serializer walks its collection once,
+        # calling apply() no more than once per object.
         def _regsync(_src, _sect: str):
-            if len(_src) != len(self[_sect]):
-                self[_sect] = {
-                    str(_src.index(reg.section)): reg.section
-                    for reg in _src
-                }
+            if _changed(_src):
+                _write(_src, _sect, {
+                    str(idx): reg.section
+                    for idx, reg in enumerate(_src)
+                })
 
         def _typesync(_src, _sect: str):
-            if len(_src) != 0:
-                self[_sect] = {
+            if _changed(_src):
+                _write(_src, _sect, {
                     str(idx): obj.apply()
-                    for idx, obj in zip(range(len(_src)), _src)
-                }
+                    for idx, obj in enumerate(_src)
+                })
 
         def _pairsync(_src, _sect: str):
-            if len(_src) != 0:
-                self[_sect] = {
-                    pair.apply()[0]: pair.apply()[1]
-                    for pair in _src
-                }
+            if _changed(_src):
+                _write(_src, _sect, dict(obj.apply() for obj in _src))
+
+        def _triggersync(_src):
+            # I have to split as these are special cases = =
+            if not _changed(_src):
+                return
+            events, actions, triggers = {}, {}, {}
+            for trig in _src:
+                key, value = trig.applyevents()
+                events[key] = value
+                key, value = trig.applyactions()
+                actions[key] = value
+                key, value = trig.apply()
+                triggers[key] = value
+            self.addnew('Events')
+            self['Events'] = events
+            self.addnew('Actions')
+            self['Actions'] = actions
+            _write(_src, 'Triggers', triggers)
 
         if not self.ismultiplay:
-            _regsync(self.houses, "Houses")
-            _regsync(self.countries, "Countries")
-        _regsync(self.scripts, "ScriptTypes")
-        _regsync(self.taskforces, "TaskForces")
-        _regsync(self.teams, "TeamTypes")
-
-        _typesync(self.localvars, "VariableNames")
-        _typesync(self.smudges, "Smudge")
-        _typesync(self.infantries, "Infantry")
-        _typesync(self.units, "Units")
-        _typesync(self.buildings, "Structures")
-        _typesync(self.aircrafts, "Aircrafts")
-
-        _pairsync(self.terrains, "Terrain")
-        _pairsync(self.celltags, "CellTags")
-        _pairsync(self.aitriggers, "AITriggerTypes")
-        _pairsync(self.triggers, "Triggers")
-        _pairsync(self.tags, "Tags")
-
-        # I have to split as these are special cases = =
-        if len(self.triggers) != 0:
-            self['Events'] = {
-                e.applyevents()[0]: e.applyevents()[1]
-                for e in self.triggers
-            }
-            self['Actions'] = {
-                a.applyactions()[0]: a.applyactions()[1]
-                for a in self.triggers
-            }
-
-        super().save(dst, encoding, withspace, blankline)
+            _regsync(_built('houses'), "Houses")
+            _regsync(_built('countries'), "Countries")
+        _regsync(_built('scripts'), "ScriptTypes")
+        _regsync(_built('taskforces'), "TaskForces")
+        _regsync(_built('teams'), "TeamTypes")
+
+        _typesync(_built('localvars'), "VariableNames")
+        _typesync(_built('smudges'), "Smudge")
+        _typesync(_built('infantries'), "Infantry")
+        _typesync(_built('units'), "Units")
+        _typesync(_built('buildings'), "Structures")
+        _typesync(_built('aircrafts'), "Aircrafts")
+
+        _pairsync(_built('terrains'), "Terrain")
+        _pairsync(_built('celltags'), "CellTags")
+        _pairsync(_built('aitriggers'), "AITriggerTypes")
+
+        _triggersync(_built('triggers'))
+        _pairsync(_built('tags'), "Tags")
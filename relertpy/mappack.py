@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+# @Time: 2026/10/17 21:40
+# @Author: Chloride
+"""
+Packed map sections as NumPy arrays.
+
+Packs are Base64 text split into numbered lines of 70 chars,
+wrapping binary data compressed by relertpy.codec:
+
+- [IsoMapPack5]: Format5 (LZO1X) packed IsoTile records.
+- [OverlayPack], [OverlayDataPack]: Format5 (Format80) packed bytes,
+  one per cell of the 512x512 map area, telling overlay types and
+  their frames.
+"""
+from base64 import b64decode, b64encode
+
+import numpy as np
+
+from .ccini import INIClass
+from .codec import (format5_decode, format5_encode,
+                    format80_decode, format80_encode)
+
+__all__ = ['ISOTILE', 'OVERLAY_NONE', 'readpack', 'writepack',
+           'loadtiles', 'savetiles', 'tilegrid',
+           'loadoverlays', 'saveoverlays']
+
+_LINE = 70
+_OVERLAYSHAPE = (512, 512)
+OVERLAY_NONE = 0xFF
+
+# 11 bytes a cell, as gamemd reads them.
+ISOTILE = np.dtype([('x', '<u2'), ('y', '<u2'), ('tile', '<i4'),
+                    ('subtile', 'u1'), ('level', 'u1'),
+                    ('icegrowth', 'u1')])
+
+
+def readpack(pini: INIClass, section: str) -> bytes:
+    """Join and decode the Base64 lines of a pack section."""
+    sect = pini.getsection(section)
+    lines = sorted(sect.items(useraw=True), key=lambda i: int(i[0]))
+    return b64decode("".join(v for _, v in lines))
+
+
+def writepack(pini: INIClass, section: str, data: bytes):
+    """Replace a pack section with data, encoded as Base64 lines."""
+    text = b64encode(data).decode('ascii')
+    pini.addnew(section)
+    pini[section] = {str(idx + 1): text[pos:pos + _LINE]
+                     for idx, pos in enumerate(range(0, len(text), _LINE))}
+
+
+def loadtiles(pmap: INIClass) -> np.ndarray:
+    """Records of [IsoMapPack5] as an ISOTILE array."""
+    data = format5_decode(readpack(pmap, 'IsoMapPack5'))
+    # FA2 may leave some padding behind the last record.
+    return np.frombuffer(data, ISOTILE,
+                         len(data) // ISOTILE.itemsize).copy()
+
+
+def savetiles(pmap: INIClass, tiles: np.ndarray):
+    """Write ISOTILE records back into [IsoMapPack5]."""
+    tiles = np.ascontiguousarray(tiles, ISOTILE)
+    writepack(pmap, 'IsoMapPack5', format5_encode(tiles.tobytes()))
+
+
+def tilegrid(tiles: np.ndarray, size=None) -> np.ndarray:
+    """
+    Scatter records into a grid indexed [y, x].
+
+    Neither x nor y of an iso cell exceeds width + height,
+    so the grid is a (width + height + 1) square by [Map] Size.
+    Cells without records are left zero, x and y included.
+
+    :param tiles: ISOTILE records.
+    :param size: [Map] Size as (left, top, width, height),
+                 or the MapClass itself.
+    """
+    if isinstance(size, INIClass):
+        size = size.getvalue('Map', 'Size')
+    side = int(size[2]) + int(size[3]) + 1 if size is not None else 0
+    if len(tiles):
+        side = max(side, int(tiles['x'].max()) + 1,
+                   int(tiles['y'].max()) + 1)
+    grid = np.zeros((side, side), ISOTILE)
+    grid[tiles['y'], tiles['x']] = tiles
+    return grid
+
+
+def _loadoverlay(pmap: INIClass, section: str, fill: int):
+    if not pmap.hassection(section):
+        return np.full(_OVERLAYSHAPE, fill, np.uint8)
+    data = format5_decode(readpack(pmap, section), format80_decode)
+    if len(data) != _OVERLAYSHAPE[0] * _OVERLAYSHAPE[1]:
+        raise ValueError(f'[{section}] unpacks to {len(data)} bytes.')
+    return np.frombuffer(data, np.uint8).reshape(_OVERLAYSHAPE).copy()
+
+
+def loadoverlays(pmap: INIClass) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Overlay types and frames, as two 512x512 uint8 arrays.
+
+    Both are indexed [y, x], with OVERLAY_NONE for cells
+    without any overlay.
+    """
+    return (_loadoverlay(pmap, 'OverlayPack', OVERLAY_NONE),
+            _loadoverlay(pmap, 'OverlayDataPack', 0))
+
+
+def saveoverlays(pmap: INIClass, types: np.ndarray, frames: np.ndarray):
+    """Write overlay types and frames back, see loadoverlays."""
+    for section, data in (('OverlayPack', types),
+                          ('OverlayDataPack', frames)):
+        data = np.ascontiguousarray(data, np.uint8)
+        if data.shape != _OVERLAYSHAPE:
+            raise ValueError(f'Expect {_OVERLAYSHAPE} for [{section}].')
+        writepack(pmap, section,
+                  format5_encode(data.tobytes(), format80_encode))
@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+# @Time: 2026/10/18 3:40
+# @Author: Chloride
+"""
+Three-way merge of INIs and maps (base, ours, theirs).
+
+    merged = merge(base, ours, theirs)
+    merged.result.save('merged.map')
+    for i in merged.conflicts:
+        print(i.section, i.key, i.ours, i.theirs)
+
+How sections get merged, when both sides changed them:
+
+- most sections key by key, parents included.
+- [Triggers], [Events] and [Actions] trigger by trigger,
+  the three values of an ID as a whole.
+- [Infantry], [Units], [Structures], [Aircrafts] and [Smudge]
+  object by object, as they're numbered by nothing but order.
+  An object both sides changed (or moved) is a conflict.
+- registries like [TeamTypes] as lists, removals and additions
+  of both sides kept.  Teams themselves are sections, see above.
+- packs like [IsoMapPack5] as a whole.
+
+IDs both sides added for different things are renamed on theirs,
+references included, before merging, see Merged.renamed.
+Conflicts are resolved by prefer, and reported anyway.
+"""
+from collections import Counter
+from typing import NamedTuple
+
+from .ccini import INIClass
+from .regids import IDAllocator
+
+__all__ = ['merge', 'Merged', 'Conflict']
+
+PACKS = frozenset(('IsoMapPack5', 'OverlayPack', 'OverlayDataPack',
+                   'PreviewPack', 'Preview', 'Digest'))
+OBJECTS = frozenset(('Infantry', 'Units', 'Structures', 'Aircrafts',
+                     'Smudge'))
+REGISTRIES = frozenset(('TeamTypes', 'ScriptTypes', 'TaskForces',
+                        'Houses', 'Countries'))
+TRIGGERS = ('Triggers', 'Events', 'Actions')
+_IDSECTIONS = ('TeamTypes', 'ScriptTypes', 'TaskForces')
+_IDKEYS = ('Triggers', 'Tags', 'AITriggerTypes')
+
+
+class Conflict(NamedTuple):
+    section: str
+    key: str | None  # None for the whole section
+    base: object
+    ours: object
+    theirs: object
+
+
+class Merged(NamedTuple):
+    result: INIClass
+    conflicts: list[Conflict]
+    renamed: dict[str, str]  # IDs of theirs -> the new ones
+
+
+def _options(ini: INIClass, name):
+    if not ini.hassection(name):
+        return None
+    sect = ini[name]
+    parent = None if sect.parent is None else str(sect.parent)
+    return parent, sect._map
+
+
+def _ids(ini: INIClass):
+    # ID -> what it stands for.
+    ret = {}
+    for reg in _IDSECTIONS:
+        for i in ini.getsection(reg).values(useraw=True):
+            ret[i] = _options(ini, i)
+    events, actions = ini.getsection('Events'), ini.getsection('Actions')
+    for sect in _IDKEYS:
+        for k, v in ini.getsection(sect).items(useraw=True):
+            ret[k] = ((v, events.get(k), actions.get(k))
+                      if sect == 'Triggers' else v)
+    return ret
+
+
+def _remap(base, ours, theirs):
+    idb, ido, idt = _ids(base), _ids(ours), _ids(theirs)
+    clashes = [i for i in ido.keys() & idt.keys()
+               if i not in idb and ido[i] != idt[i]]
+    if not clashes:
+        return theirs, {}
+    alloc = IDAllocator(ours)
+    alloc.reserve(*idb, *idt)
+    renamed = {i: alloc.next('G' if i.endswith('-G') else 'fa2')
+               for i in sorted(clashes)}
+
+    theirs = theirs.clone()
+    for name in list(theirs):
+        if name in PACKS:
+            continue
+        sect = theirs[name]
+        options, changed = {}, False
+        for k, v in sect._map.items():
+            nk = renamed.get(k, k)
+            tokens = v.split(',')
+            if any(i in renamed for i in tokens):
+                v = ",".join(renamed.get(i, i) for i in tokens)
+                changed = True
+            changed = changed or nk != k
+            options[nk] = v
+        if changed:
+            sect.copydata(options)
+        if name in renamed:
+            theirs.rename(name, renamed[name])
+    return theirs, renamed
+
+
+def _three(b, o, t, key, conflicts, section, prefer):
+    # the value to take, or ours.
+    if o == t or t == b:
+        return o
+    if o == b:
+        return t
+    conflicts.append(Conflict(section, key, b, o, t))
+    return t if prefer == 'theirs' else o
+
+
+def _mergekeys(name, b, o, t, conflicts, prefer):
+    ret = dict(o)
+    for k in dict.fromkeys((*t, *b)):
+        if k in o and o.get(k) == t.get(k):
+            continue
+        v = _three(b.get(k), o.get(k), t.get(k), k, conflicts, name, prefer)
+        if v is None:
+            ret.pop(k, None)
+        else:
+            ret[k] = v
+    return ret
+
+
+def _objkind(value):
+    # owner and type of cell objects.
+    return tuple(value.split(',', 2)[:2])
+
+
+def _pop(counter, kind):
+    # one of the objects in counter of the kind, if any.
+    for i, count in counter.items():
+        if count > 0 and _objkind(i) == kind:
+            counter[i] -= 1
+            return i
+    return None
+
+
+def _mergeobjects(name, b, o, t, conflicts, prefer):
+    vb, vo, vt = (Counter(i.values()) for i in (b, o, t))
+    drop = (vb - vt) - (vb - vo)  # removed by theirs only
+    add = (vt - vb) - (vo - vb)  # added by theirs only
+    # objects both sides replaced, like moved, but differently.
+    mine, their = vo - vb, Counter(add)
+    for value in ((vb - vo) & (vb - vt)).elements():
+        kind = _objkind(value)
+        if not any(_objkind(i) == kind for i in +their):
+            continue
+        new_o = _pop(mine, kind)
+        if new_o is None:
+            continue
+        new_t = _pop(their, kind)
+        conflicts.append(Conflict(name, value, value, new_o, new_t))
+        if prefer == 'theirs':
+            drop[new_o] += 1
+        else:
+            add[new_t] -= 1
+    ret = []
+    for i in o.values():
+        if drop[i] > 0:
+            drop[i] -= 1
+        else:
+            ret.append(i)
+    for i in t.values():
+        if add[i] > 0:
+            add[i] -= 1
+            ret.append(i)
+    return {str(idx): v for idx, v in enumerate(ret)}
+
+
+def _mergelist(b, o, t):
+    lb, lo, lt = (list(i.values()) for i in (b, o, t))
+    gone = set(lb) - set(lt)
+    known = set(lb) | set(lo)
+    ret = [i for i in lo if i not in gone]
+    ret += [i for i in dict.fromkeys(lt) if i not in known]
+    return {str(idx): v for idx, v in enumerate(ret)}
+
+
+def _mergetriggers(base, ours, theirs, conflicts, prefer):
+    def table(ini):
+        events = ini.getsection('Events')
+        actions = ini.getsection('Actions')
+        return {k: (v, events.get(k), actions.get(k))
+                for k, v in ini.getsection('Triggers').items(useraw=True)}
+
+    tb, to, tt = table(base), table(ours), table(theirs)
+    if to == tt or tt == tb:
+        return None
+    ret = dict(to)
+    for k in dict.fromkeys((*tt, *tb)):
+        v = _three(tb.get(k), to.get(k), tt.get(k), k, conflicts,
+                   'Triggers', prefer)
+        if v is None:
+            ret.pop(k, None)
+        else:
+            ret[k] = v
+    return [{k: v[i] for k, v in ret.items() if v[i] is not None}
+            for i in range(len(TRIGGERS))]
+
+
+def merge(base: INIClass, ours: INIClass, theirs: INIClass, *,
+          prefer='ours') -> Merged:
+    """
+    Merge changes of ours and theirs since base.
+
+    Maps get synced first.  The result is a clone of ours,
+    leaving all three as they are.
+
+    :param prefer: 'ours' or 'theirs', who wins conflicts.
+    """
+    if prefer not in ('ours', 'theirs'):
+        raise ValueError(f"Unknown side: {prefer}.")
+    for i in (base, ours, theirs):
+        if hasattr(i, 'sync'):
+            i.sync()
+    theirs, renamed = _remap(base, ours, theirs)
+    result = ours.clone()
+    conflicts = []
+
+    def write(name, parent, options):
+        result.addnew(name)
+        result[name] = options
+        result[name].parent = parent
+
+    for name in dict.fromkeys((*ours, *theirs, *base)):
+        if name in TRIGGERS:
+            continue
+        b, o, t = (_options(i, name) for i in (base, ours, theirs))
+        if o == t or t == b:
+            continue
+        if o == b:
+            if t is None:
+                result.remove(name)
+            else:
+                write(name, *t)
+            continue
+        if None in (o, t) or name in PACKS:
+            conflicts.append(Conflict(name, None, b, o, t))
+            if prefer == 'theirs':
+                if t is None:
+                    result.remove(name)
+                else:
+                    write(name, *t)
+            continue
+        b = b or (None, {})
+        parent = _three(b[0], o[0], t[0], ':', conflicts, name, prefer)
+        if name in OBJECTS:
+            options = _mergeobjects(name, b[1], o[1], t[1],
+                                    conflicts, prefer)
+        elif name in REGISTRIES:
+            options = _mergelist(b[1], o[1], t[1])
+        else:
+            options = _mergekeys(name, b[1], o[1], t[1], conflicts, prefer)
+        write(name, parent, options)
+
+    merged = _mergetriggers(base, ours, theirs, conflicts, prefer)
+    if merged is not None:
+        for name, options in zip(TRIGGERS, merged):
+            write(name, None, options)
+    result.resolve()
+    return Merged(result, conflicts, renamed)
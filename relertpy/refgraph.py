@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+# @Time: 2026/10/17 23:10
+# @Author: Chloride
+"""
+Reverse references among map logics.
+
+Nodes are (kind, key) tuples, kind being the name of a MapClass
+collection.  Key is the ID for triggers, tags, teams, scripts,
+taskforces and AI triggers, or the object itself for cell objects:
+
+    graph = ReferenceGraph(pmap)
+    graph.users('teams', '01000123')  # who uses this team?
+    graph.orphans('triggers')        # triggers nobody attaches
+
+These fields are followed:
+
+- Tag.trigger, Trigger.assoc
+- Team 'Script', 'TaskForce' and 'Tag'
+- the two teams of AI triggers
+- 'tag' of infantry, units, aircraft and buildings, CellTag.tagof
+- trigger event and action params equal to a known ID.  IDs are
+  unique across kinds by FA2 numbering, so this needs no schema.
+
+Collections are rescanned on the next query once they change.
+Registry sections (like teams) aren't tracked, so call update()
+after editing one in place.
+"""
+from .types import TrackedList
+
+__all__ = ['ReferenceGraph', 'TARGETS', 'REFERRERS']
+
+TARGETS = ('triggers', 'tags', 'teams', 'scripts', 'taskforces',
+           'aitriggers')
+REFERRERS = TARGETS + ('infantries', 'units', 'aircrafts', 'buildings',
+                       'celltags')
+_NONE = frozenset((None, '', '<none>', 'None', 'none'))
+# AI trigger fields after the name, aimd.ini says.
+_AITEAMS = (0, 13)
+
+
+class ReferenceGraph:
+    """Forward and reverse references among map objects."""
+
+    def __init__(self, pmap):
+        self.pmap = pmap
+        self._sources = {}  # kind -> (collection, its version)
+        self._forward = {}  # kind -> {referrer: (targets,)}
+        self._reverse = {}  # target -> {referrer: None}, ordered
+        self._ids = {}  # kind -> {key: None} of existing targets
+        self._kinds = {}  # key -> kinds having that key
+        self.refresh()
+
+    @staticmethod
+    def _key(kind, obj):
+        if kind in ('teams', 'scripts', 'taskforces'):
+            return obj.section
+        return obj.id if kind in TARGETS else obj
+
+    def _links(self, kind, obj):
+        if kind == 'triggers':
+            yield 'triggers', obj.assoc
+            for i in (*obj.events, *obj.actions):
+                for param in i.params:
+                    for target in self._kinds.get(param, ()):
+                        yield target, param
+        elif kind == 'tags':
+            yield 'triggers', obj.trigger
+        elif kind == 'teams':
+            # get() keeps the raw text, as parsing drops leading zeros.
+            yield 'scripts', obj.get('Script')
+            yield 'taskforces', obj.get('TaskForce')
+            yield 'tags', obj.get('Tag')
+        elif kind == 'aitriggers':
+            for i in _AITEAMS:
+                if i < len(obj):
+                    yield 'teams', obj[i]
+        elif kind == 'celltags':
+            yield 'tags', obj.tagof
+        elif kind in ('infantries', 'units', 'aircrafts', 'buildings'):
+            yield 'tags', obj.tag
+
+    def _stale(self, kind):
+        src = getattr(self.pmap, kind)
+        cached = self._sources.get(kind)
+        return not (cached is not None and cached[0] is src and
+                    isinstance(src, TrackedList) and
+                    cached[1] == src.version)
+
+    def refresh(self):
+        """Rescan changed collections, queries do this themselves."""
+        changed = [i for i in REFERRERS if self._stale(i)]
+        if any(i in TARGETS for i in changed):
+            self._ids = {i: dict.fromkeys(self._key(i, obj)
+                                          for obj in getattr(self.pmap, i))
+                         for i in TARGETS}
+            self._kinds = {}
+            for kind, keys in self._ids.items():
+                for key in keys:
+                    self._kinds.setdefault(key, []).append(kind)
+            # trigger params are matched against every known ID.
+            if 'triggers' not in changed:
+                changed.append('triggers')
+        for kind in changed:
+            self._scan(kind)
+
+    def _scan(self, kind):
+        src = getattr(self.pmap, kind)
+        for referrer, targets in self._forward.pop(kind, {}).items():
+            self._unlink(referrer, targets)
+        forward = self._forward[kind] = {}
+        for obj in src:
+            referrer = kind, self._key(kind, obj)
+            forward[referrer] = self._link(referrer, kind, obj)
+        self._sources[kind] = src, getattr(src, 'version', None)
+
+    def _link(self, referrer, kind, obj):
+        targets = tuple(dict.fromkeys(i for i in self._links(kind, obj)
+                                      if i[1] not in _NONE))
+        for i in targets:
+            self._reverse.setdefault(i, {})[referrer] = None
+        return targets
+
+    def _unlink(self, referrer, targets):
+        for i in targets:
+            users = self._reverse.get(i)
+            if users is not None:
+                users.pop(referrer, None)
+                if not users:
+                    del self._reverse[i]
+
+    def update(self, kind, key):
+        """Rescan one referrer, e.g. a team edited in place."""
+        self.refresh()
+        forward = self._forward[kind]
+        referrer = kind, key
+        self._unlink(referrer, forward.pop(referrer, ()))
+        for obj in getattr(self.pmap, kind):
+            if self._key(kind, obj) == key:
+                forward[referrer] = self._link(referrer, kind, obj)
+                break
+
+    def users(self, kind, key):
+        """Referrers of (kind, key), as a list of nodes."""
+        self.refresh()
+        return list(self._reverse.get((kind, key), ()))
+
+    def uses(self, kind, key):
+        """What (kind, key) refers to, as a list of nodes."""
+        self.refresh()
+        return list(self._forward.get(kind, {}).get((kind, key), ()))
+
+    def dangling(self):
+        """(referrer, target) pairs whose target doesn't exist."""
+        self.refresh()
+        return [(referrer, target)
+                for target, users in self._reverse.items()
+                if target[1] not in self._ids[target[0]]
+                for referrer in users]
+
+    def orphans(self, kind):
+        """Keys of kind nobody refers to, like dead triggers."""
+        self.refresh()
+        return [key for key in self._ids[kind]
+                if (kind, key) not in self._reverse]
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+# @Time: 2026/10/18 2:30
+# @Author: Chloride
+"""
+Allocation of IDs for teams, scripts, taskforces, triggers and tags.
+
+FA2 numbers all of them in a single namespace, while they live in
+different places: sections of their own for registries like teams,
+keys of [Triggers], [Tags] and [AITriggerTypes] for the others.
+IDAllocator indexes them all once, then hands out fresh IDs:
+
+    ids = pmap.regids
+    ids.take(500)            # ['01003240', '01003241', ...]
+    ids.take(2, style='G')   # ['3F2A9C01-G', 'B07D11E4-G']
+
+Built collections are rescanned once they change, so removed IDs
+are free again, while IDs handed out stay reserved until release().
+Sections are indexed once, and looked up for keys added later.
+"""
+from uuid import uuid4
+
+from .types import TrackedList
+
+__all__ = ['IDAllocator', 'STYLES']
+
+STYLES = ('fa2', 'G')
+# collection -> where it is when not built, and whether it's a registry.
+_SOURCES = {
+    'teams': ('TeamTypes', True),
+    'scripts': ('ScriptTypes', True),
+    'taskforces': ('TaskForces', True),
+    'triggers': ('Triggers', False),
+    'tags': ('Tags', False),
+    'aitriggers': ('AITriggerTypes', False),
+}
+_FA2FIRST = 1000000
+
+
+class IDAllocator:
+    """IDs in use by map logics, and fresh ones."""
+
+    def __init__(self, pmap, style='fa2'):
+        """
+        :param pmap: the map.
+        :param style: default style, 'fa2' for '01000123',
+                      'G' for random ones like '3F2A9C01-G'.
+        """
+        if style not in STYLES:
+            raise ValueError(f"Unknown ID style: {style}.")
+        self.pmap = pmap
+        self.style = style
+        self._ids = {}  # kind -> set of IDs
+        self._sources = {}  # kind -> (collection, its version)
+        self._reserved = set()
+        self._next = None  # the next number of fa2 style
+
+    def _scan(self, kind):
+        built = vars(self.pmap).get(kind)
+        section, isreg = _SOURCES[kind]
+        if built is None:
+            src = self.pmap.getsection(section)
+            ids = set(src.values(useraw=True) if isreg else src)
+        elif isreg:
+            ids = {i.section for i in built}
+        else:
+            ids = {i.id for i in built}
+        self._ids[kind] = ids
+        self._sources[kind] = built, getattr(built, 'version', None)
+        if self._next is not None:
+            self._next = max(self._next, _nextnumber(ids))
+
+    def refresh(self):
+        """
+        Rescan changed collections, allocating does this itself.
+
+        A collection is rescanned once it's built, changed or dropped
+        again, and a section without one once, as keys added to it
+        directly are looked up there on demand, see used().
+        """
+        for kind in _SOURCES:
+            built = vars(self.pmap).get(kind)
+            cached = self._sources.get(kind)
+            if cached is None or cached[0] is not built or (
+                    built is not None and not (
+                        isinstance(built, TrackedList) and
+                        cached[1] == built.version)):
+                self._scan(kind)
+
+    def used(self, idx):
+        """Whether idx is taken by any section, object or reservation."""
+        if idx in self._reserved or self.pmap.hassection(idx):
+            return True
+        if any(idx in i for i in self._ids.values()):
+            return True
+        # keys written into sections after they got scanned.
+        return any(not isreg and kind not in vars(self.pmap) and
+                   idx in self.pmap.getsection(section)
+                   for kind, (section, isreg) in _SOURCES.items())
+
+    def __contains__(self, idx):
+        self.refresh()
+        return self.used(idx)
+
+    def take(self, count=1, style=None):
+        """
+        Reserve and return count fresh IDs.
+
+        :param count: how many.
+        :param style: 'fa2' or 'G', the default one if None.
+        """
+        style = self.style if style is None else style
+        if style not in STYLES:
+            raise ValueError(f"Unknown ID style: {style}.")
+        self.refresh()
+        ret = []
+        if style == 'fa2':
+            if self._next is None:
+                self._next = max(_nextnumber(self._reserved),
+                                 *map(_nextnumber, self._ids.values()))
+            while len(ret) < count:
+                idx = "%08d" % self._next
+                self._next += 1
+                if not self.used(idx):
+                    ret.append(idx)
+                    self._reserved.add(idx)
+        else:
+            while len(ret) < count:
+                idx = "%08s-G" % str(uuid4()).split("-")[0].upper()
+                if not self.used(idx):
+                    ret.append(idx)
+                    self._reserved.add(idx)
+        return ret
+
+    def next(self, style=None):
+        """A single fresh ID, see take."""
+        return self.take(1, style)[0]
+
+    def reserve(self, *ids):
+        """Keep IDs from being handed out, like those of another map."""
+        self._reserved.update(ids)
+        if self._next is not None:
+            self._next = max(self._next, _nextnumber(ids))
+
+    def release(self, *ids):
+        """Give back IDs taken but not used."""
+        self._reserved.difference_update(ids)
+
+
+def _nextnumber(ids):
+    # the one after the greatest ID in FA2 style.
+    return max((int(i) + 1 for i in ids
+                if len(i) == 8 and i.isdecimal()), default=_FA2FIRST)
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+# @Time: 2026/10/18 1:40
+# @Author: Chloride
+"""
+Layered view of rules, art and maps, as the game reads them.
+
+Each INI stays a layer of its own, upper layers overriding lower ones
+key by key.  Load the game INIs once, then lay maps over them, sharing
+the parsed (and cached) rules instead of copying them into each map:
+
+    rules = LayeredINI.fromfiles('rulesmd.ini', 'artmd.ini')
+    for i in maps:
+        view = rules.overlay(CCMap(i))
+        view.getvalue('GAPOWR', 'Power')     # map first, then rules
+        view.typeindex('BuildingTypes')['GAPOWR']
+
+[#include] of Ares is followed by fromfiles, each included file
+becoming a layer right above the one including it.  [A]:[B] parents
+are found by name in any layer, e.g. a map section inheriting
+a rules one.
+
+Lookups are cached per view.  After editing any layer, call
+invalidate() on the view holding it, and views over it follow.
+"""
+from os import PathLike, path as _path
+from types import MappingProxyType
+
+from .ccini import INIClass
+
+__all__ = ['LayeredINI', 'REGISTRIES']
+
+# sections listing types, merged rather than overridden.
+REGISTRIES = ('InfantryTypes', 'VehicleTypes', 'AircraftTypes',
+              'BuildingTypes', 'TerrainTypes', 'SmudgeTypes',
+              'OverlayTypes', 'Animations', 'VoxelAnims', 'Particles',
+              'ParticleSystems', 'SuperWeaponTypes', 'Warheads',
+              'Tiberiums', 'Countries', 'Sides')
+
+
+class LayeredINI:
+    """INI layers from bottom to top, with an optional shared base."""
+
+    def __init__(self, *layers: INIClass, base: 'LayeredINI' = None):
+        self.base = base
+        self.layers = list(layers)
+        self._bump = 0  # see version
+        self._seen = None
+        self._owners = {}  # (section, key) -> INISectionClass | None
+        self._merged = {}  # section -> {key: raw value}
+        self._registries = {}  # section -> {type: index}
+        self._kinds = None  # type -> registry
+
+    @classmethod
+    def fromfiles(cls, *paths: PathLike | str, encoding='utf-8',
+                  cache=None, base: 'LayeredINI' = None):
+        """
+        Load INI files as layers, following [#include] recursively.
+
+        Included paths are relative to the including file.
+        A file already loaded won't be included again.
+
+        :param paths: INI files, the lowest layer first.
+        :param encoding: text encoding.
+        :param cache: see INIClass.load.
+        :param base: a view to lay these files over.
+        """
+        layers = []
+        loaded = set()
+
+        def include(ref):
+            ref = _path.abspath(ref)
+            if ref in loaded or not _path.isfile(ref):
+                return
+            loaded.add(ref)
+            ini = INIClass()
+            ini.load(ref, encoding=encoding, cache=cache)
+            layers.append(ini)
+            if ini.hassection('#include'):
+                for i in ini['#include'].values(useraw=True):
+                    include(_path.join(_path.dirname(ref), i))
+
+        for i in paths:
+            include(i)
+        return cls(*layers, base=base)
+
+    def overlay(self, *layers: INIClass):
+        """A new view of layers upon this one, sharing its caches."""
+        return type(self)(*layers, base=self)
+
+    @property
+    def version(self):
+        """Count of invalidations, of this view and the ones below."""
+        return self._bump + (self.base.version if self.base else 0)
+
+    def invalidate(self):
+        """Drop the cached lookups, after layers got edited."""
+        self._bump += 1
+
+    def _check(self):
+        version = self.version
+        if self._seen != version:
+            self._owners.clear()
+            self._merged.clear()
+            self._registries.clear()
+            self._kinds = None
+            self._seen = version
+
+    def parentof(self, section):
+        """
+        Name of the parent of section, None if it has no one.
+
+        The topmost layer declaring [section]:[parent] tells it.
+        """
+        for ini in reversed(self.layers):
+            if ini.hassection(section):
+                parent = ini[section].parent
+                if parent is not None:
+                    return str(parent)
+        return None if self.base is None else self.base.parentof(section)
+
+    def _lineage(self, section):
+        # the section, its parent and so on, stopping at loops.
+        ret = [section]
+        parent = self.parentof(section)
+        while parent is not None and parent not in ret:
+            ret.append(parent)
+            parent = self.parentof(parent)
+        return ret
+
+    def _direct(self, section, key):
+        # the section object having the key itself, no inheritance.
+        for ini in reversed(self.layers):
+            if ini.hassection(section) and key in ini[section]._map:
+                return ini[section]
+        return None if self.base is None else self.base._direct(section,
+                                                                key)
+
+    def owner(self, section, key):
+        """
+        The section object giving the value, None if no one does.
+
+        Parents are looked up by name through all layers, so a map
+        section may inherit from rules, and overriding a key of a
+        parent reaches its children in any layer.
+        """
+        self._check()
+        try:
+            return self._owners[section, key]
+        except KeyError:
+            pass
+        ret = None
+        for i in self._lineage(section):
+            ret = self._direct(i, key)
+            if ret is not None:
+                break
+        self._owners[section, key] = ret
+        return ret
+
+    def hassection(self, section):
+        return (any(i.hassection(section) for i in self.layers) or
+                (self.base is not None and self.base.hassection(section)))
+
+    def hasoption(self, section, key):
+        return self.owner(section, key) is not None
+
+    def get(self, section, key, fallback=None):
+        """The raw value."""
+        owner = self.owner(section, key)
+        return fallback if owner is None else owner.get(key)
+
+    def getvalue(self, section, key, fallback=None):
+        """The parsed value, see INISectionClass.tryparse."""
+        owner = self.owner(section, key)
+        return fallback if owner is None else owner.tryparse(key, fallback)
+
+    def _options(self, section):
+        # raw options of the section through all layers, no inheritance.
+        ret = {} if self.base is None else self.base._options(section)
+        for ini in self.layers:
+            if ini.hassection(section):
+                ret.update(ini[section]._map)
+        return ret
+
+    def getsection(self, section):
+        """Raw options of the section and its ancestors, merged."""
+        self._check()
+        ret = self._merged.get(section)
+        if ret is None:
+            ret = {}
+            for i in reversed(self._lineage(section)):
+                ret.update(self._options(i))
+            ret = self._merged[section] = MappingProxyType(ret)
+        return ret
+
+    def typeindex(self, registry):
+        """
+        Types listed in the registry, as {type: index}.
+
+        Like the game does, every layer appends types not listed yet,
+        whatever the keys are.
+        """
+        self._check()
+        ret = self._registries.get(registry)
+        if ret is None:
+            ret = (dict(self.base.typeindex(registry))
+                   if self.base is not None else {})
+            for ini in self.layers:
+                if ini.hassection(registry):
+                    for i in ini[registry].values(useraw=True):
+                        if i and i not in ret:
+                            ret[i] = len(ret)
+            ret = self._registries[registry] = MappingProxyType(ret)
+        return ret
+
+    def gettypelist(self, registry):
+        return list(self.typeindex(registry))
+
+    def registryof(self, typename):
+        """Which of REGISTRIES lists the type, None if no one."""
+        self._check()
+        if self._kinds is None:
+            self._kinds = {}
+            for i in reversed(REGISTRIES):
+                self._kinds.update(dict.fromkeys(self.typeindex(i), i))
+        return self._kinds.get(typename)
+
+    def __contains__(self, section):
+        return self.hassection(section)
+
+    def __getitem__(self, section):
+        if not self.hassection(section):
+            raise KeyError(section)
+        return self.getsection(section)
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+# @Time: 2026/10/17 22:30
+# @Author: Chloride
+"""
+Spatial index over cell-bound map objects.
+
+Objects get bucketed by the cells they take, collection by collection,
+only when a query first needs them.  Collections are TrackedLists,
+so once one changes (objects added, removed or moved), its buckets
+get rebuilt on the next query, leaving the other ones as they are.
+
+Buildings take more than their top cell.  As foundations are written
+in art(md).ini instead of maps, pass them in, e.g.:
+
+    index = SpatialIndex(pmap, loadfoundations(artmd))
+    index.around(index.waypoint(12), 5)
+"""
+from math import hypot
+from typing import Iterable, Mapping
+
+from .ccini import INIClass
+from .types import TrackedList
+
+__all__ = ['SpatialIndex', 'loadfoundations', 'KINDS']
+
+KINDS = ('waypoints', 'terrains', 'celltags', 'smudges',
+         'infantries', 'units', 'buildings', 'aircrafts')
+# these are coordinates themselves, others keep 'coord'.
+_POINTS = frozenset(('waypoints', 'terrains', 'celltags'))
+# cells are grouped into blocks of 8x8 for area queries.
+_BLOCK = 3
+
+
+def loadfoundations(art: INIClass) -> dict[str, tuple[int, int]]:
+    """
+    Foundation sizes of all art sections declaring one.
+
+    Besides 'Foundation=3x2', Ares' 'Foundation=Custom' with
+    'Foundation.X' and 'Foundation.Y' is understood as well.
+    """
+    ret = {}
+    for name in art:
+        sect = art[name]
+        value = str(sect.get('Foundation', '')).lower()
+        if not value:
+            continue
+        if value == 'custom':
+            width = sect.get('Foundation.X')
+            height = sect.get('Foundation.Y')
+        else:
+            width, _, height = value.partition('x')
+        try:
+            ret[name] = int(width), int(height)
+        except (TypeError, ValueError):
+            continue
+    return ret
+
+
+class SpatialIndex:
+    """Per-cell buckets of map objects."""
+
+    def __init__(self, pmap, foundations: Mapping[str, tuple] = None):
+        """
+        :param pmap: the MapClass to index.
+        :param foundations: building type -> (width, height),
+                            1x1 for those not found.
+        """
+        self.pmap = pmap
+        self.foundations = foundations or {}
+        # kind -> (source list, its version,
+        #          {cell: [objects]}, {block: [cells]})
+        self._buckets = {}
+
+    def _cells(self, kind, obj):
+        x, y = obj if kind in _POINTS else obj.coord
+        if kind != 'buildings':
+            return ((x, y),)
+        width, height = self.foundations.get(obj.typeof, (1, 1))
+        return [(x + dx, y + dy)
+                for dx in range(width) for dy in range(height)]
+
+    def _index(self, kind):
+        src = getattr(self.pmap, kind)
+        version = getattr(src, 'version', None)
+        cached = self._buckets.get(kind)
+        if (cached is not None and cached[0] is src and
+                isinstance(src, TrackedList) and cached[1] == version):
+            return cached
+        cells = {}
+        for obj in src:
+            for cell in self._cells(kind, obj):
+                if cell in cells:
+                    cells[cell].append(obj)
+                else:
+                    cells[cell] = [obj]
+        blocks = {}
+        for cell in cells:
+            block = cell[0] >> _BLOCK, cell[1] >> _BLOCK
+            if block in blocks:
+                blocks[block].append(cell)
+            else:
+                blocks[block] = [cell]
+        cached = self._buckets[kind] = src, version, cells, blocks
+        return cached
+
+    def buckets(self, kind):
+        """Cell -> objects of one collection, rebuilt once it changed."""
+        return self._index(kind)[2]
+
+    def invalidate(self, kind=None):
+        """Drop the buckets of kind (all by default), e.g. foundations."""
+        if kind is None:
+            self._buckets.clear()
+        else:
+            self._buckets.pop(kind, None)
+
+    def waypoint(self, pid: int):
+        """Waypoint of that number, or None."""
+        for i in self.pmap.waypoints:
+            if i.pid == pid:
+                return i
+        return None
+
+    def at(self, x: int, y: int, kinds: Iterable[str] = KINDS):
+        """Objects taking cell (x, y)."""
+        ret = []
+        for kind in kinds:
+            ret.extend(self.buckets(kind).get((x, y), ()))
+        return ret
+
+    def _search(self, kinds, left, top, right, bottom, accept=None):
+        ret = {}
+        keys = [(bx, by)
+                for bx in range(left >> _BLOCK, (right >> _BLOCK) + 1)
+                for by in range(top >> _BLOCK, (bottom >> _BLOCK) + 1)]
+        for kind in kinds:
+            _, _, cells, blocks = self._index(kind)
+            for key in keys:
+                for cell in blocks.get(key, ()):
+                    if (left <= cell[0] <= right and
+                            top <= cell[1] <= bottom and
+                            (accept is None or accept(cell))):
+                        for obj in cells[cell]:
+                            # buildings may take several cells found.
+                            ret.setdefault(id(obj), obj)
+        return list(ret.values())
+
+    def within(self, left: int, top: int, right: int, bottom: int,
+               kinds: Iterable[str] = KINDS):
+        """Objects taking any cell of the rectangle, edges included."""
+        return self._search(kinds, left, top, right, bottom)
+
+    def around(self, center, radius: float, kinds: Iterable[str] = KINDS):
+        """
+        Objects taking any cell within radius of center.
+
+        :param center: (x, y), or a cell-bound object like a Waypoint.
+        :param radius: in cells.
+        """
+        cx, cy = center
+        reach = int(radius)
+        return self._search(kinds, cx - reach, cy - reach,
+                            cx + reach, cy + reach,
+                            lambda c: hypot(c[0] - cx, c[1] - cy) <= radius)
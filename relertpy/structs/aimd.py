@@ -11,7 +11,7 @@ In YR, AI consists of these following components:
 """
 from .celldata import Waypoint
 from ..ccini import INISectionClass
-from ..types import Array
+from ..types import Array, TrackedArray
 
 _team_default = {
     'Max': '5',
@@ -102,7 +102,7 @@ class TaskForce(INISectionClass):
         return f'TaskForce {self.section}'
 
 
-class AITrigger(Array):
+class AITrigger(TrackedArray):
     # this guy doesn't work well in singleplay,
     # so I don't want to declare clearly.
     def __init__(self, pair: tuple[str, str | Array]) -> None:
@@ -9,8 +9,8 @@ there could be these following items on a cell:
 - Terrain object
 - CellTag
 - Smudge
-- Tile (won't parse)
-- Overlay (won't parse)
+- Tile (won't parse here, see relertpy.mappack)
+- Overlay (won't parse here, see relertpy.mappack)
 - Object instance(s) (Infantries, Units, etc.)
 
 WPs, Terrains, CellTags are all recorded as a tuple:
@@ -21,10 +21,13 @@ with a useless numbering (gamemd uses array index actually)
 as key, and an Array-like string as value.
 """
 import abc
-from ..types import Array, Coord
+from sys import intern
 
+from ..types import Array, Coord, Point2D, Tracked
 
-class Waypoint(Array):
+
+class Waypoint(Point2D):
+    __slots__ = ('pid',)
     __CHARS = list(map(lambda x: chr(x), range(ord('A'), ord('Z') + 1)))
 
     def __init__(self, kv: tuple):
@@ -73,7 +76,9 @@ class Waypoint(Array):
         return f'WP {self.pid}: {tuple(self)}'
 
 
-class Terrain(Array):
+class Terrain(Point2D):
+    __slots__ = ('terrain',)
+
     def __init__(self, kv: tuple):
         self.terrain = kv[1]
         super().__init__(Coord.split(kv[0]))
@@ -85,7 +90,9 @@ class Terrain(Array):
         return f'Terrain {self.terrain}: {tuple(self)}'
 
 
-class CellTag(Array):
+class CellTag(Point2D):
+    __slots__ = ('tagof',)
+
     def __init__(self, kv: tuple):
         super().__init__(Coord.split(kv[0]))
         self.tagof = kv[1]
@@ -97,12 +104,14 @@ class CellTag(Array):
         return f'Tag {self.tagof}: {tuple(self)}'
 
 
-class Smudge:
+class Smudge(Tracked):
+    __slots__ = ('_owner', 'typeof', 'coord', 'ignored')
+
     def __init__(self, args: str | Array):
         if type(args) == str:
             args = args.split(',')
         self.typeof = args[0]
-        self.coord = Array(map(int, args[1:3]))
+        self.coord = Point2D(map(int, args[1:3]))
         self.ignored = args[3] == '1'
 
     def apply(self):
@@ -115,22 +124,24 @@ class Smudge:
         return f'{self.typeof} TopCell({self.coord})'
 
 
-class FootClass(metaclass=abc.ABCMeta):
-    owner = 'Neutral House'
-    typeof = ""
-    health = 256
-    coord = Array(0, 0)
-    mission = 'Guard'
-    facing = 0
-    tag = None
-    veteran = 0
-    group = -1
-    autocreate_no = False
-    autocreate_yes = True
+class FootClass(Tracked, metaclass=abc.ABCMeta):
+    __slots__ = ('_owner', 'owner', 'typeof', 'health', 'coord',
+                 'mission', 'facing', 'tag', 'veteran', 'group',
+                 'autocreate_no', 'autocreate_yes')
 
     @abc.abstractmethod
     def __init__(self):
-        pass
+        self.owner = 'Neutral House'
+        self.typeof = ""
+        self.health = 256
+        self.coord = Point2D()
+        self.mission = 'Guard'
+        self.facing = 0
+        self.tag = None
+        self.veteran = 0
+        self.group = -1
+        self.autocreate_no = False
+        self.autocreate_yes = True
 
     @abc.abstractmethod
     def apply(self):
@@ -148,17 +159,18 @@ class FootClass(metaclass=abc.ABCMeta):
 class FootUtil:
     @staticmethod
     def newobject(ins, args: str | Array):
-        ins.owner = args[0]
-        ins.typeof = args[1]
+        # owners and types repeat a lot, so share one string each.
+        ins.owner = intern(args[0])
+        ins.typeof = intern(args[1])
         ins.health = int(args[2])
-        ins.coord = Array(map(int, args[3:5]))
+        ins.coord = Point2D(map(int, args[3:5]))
         return ins
 
     @staticmethod
     def newunit(ins, args: str | Array):
         ins = FootUtil.newobject(ins, args)
         ins.facing = int(args[5])
-        ins.mission = args[6]
+        ins.mission = intern(args[6])
         ins.tag = None if args[7] == 'None' else args[7]
         ins.veteran = int(args[8])
         ins.group = int(args[9])
@@ -166,7 +178,10 @@ class FootUtil:
 
 
 class Infantry(FootClass):
+    __slots__ = ('subcell', 'onbridge')
+
     def __init__(self):
+        super().__init__()
         self.typeof = 'E1'
         self.subcell = 0
         self.onbridge = False
@@ -177,7 +192,7 @@ class Infantry(FootClass):
             args = args.split(',')
         ret = FootUtil.newobject(cls(), args)
         ret.subcell = int(args[5])
-        ret.mission = args[6]
+        ret.mission = intern(args[6])
         ret.facing = int(args[7])
         ret.tag = None if args[8] == 'None' else args[8]
         ret.veteran = int(args[9])
@@ -197,7 +212,10 @@ class Infantry(FootClass):
 
 
 class Aircraft(FootClass):
+    __slots__ = ()
+
     def __init__(self):
+        super().__init__()
         self.typeof = 'ORCA'
 
     @classmethod
@@ -220,7 +238,10 @@ class Aircraft(FootClass):
 
 
 class Vehicle(FootClass):
+    __slots__ = ('onbridge', 'followid')
+
     def __init__(self):
+        super().__init__()
         self.typeof = 'AMCV'
         self.onbridge = False
         self.followid = -1
@@ -245,12 +266,16 @@ class Vehicle(FootClass):
         ]))
 
 
-class Building:
+class Building(Tracked):
+    __slots__ = ('_owner', 'owner', 'typeof', 'health', 'coord', 'facing',
+                 'tag', 'ai_sellable', 'ai_rebuildable', 'powered',
+                 'upgrades', 'spotlight', 'ai_repair', 'norminal')
+
     def __init__(self):
         self.owner = 'Neutral House'
         self.typeof = 'GAPOWR'
         self.health = 256
-        self.coord = Array(0, 0)  # only consider the top
+        self.coord = Point2D()  # only consider the top
         self.facing = 0
         self.tag = None
         self.ai_sellable = False
@@ -34,7 +34,7 @@ from ..ccini import INISectionClass
 
 class House(INISectionClass):
     def __init__(self, pini, h_name):
-        super().__init__(h_name, **pini[h_name])
+        super().__init__(h_name, **dict(pini[h_name].items(useraw=True)))
 
     def __repr__(self):
         return self.section
@@ -60,7 +60,7 @@ class House(INISectionClass):
 
 class Country(INISectionClass):
     def __init__(self, pini, c_name):
-        super().__init__(c_name, **pini[c_name])
+        super().__init__(c_name, **dict(pini[c_name].items(useraw=True)))
 
     def __repr__(self):
         return self.section
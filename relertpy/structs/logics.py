@@ -31,8 +31,14 @@ which one shall be affected (TInstance[Inf, ...].tag).
 """
 from typing import Sequence
 
+from ..trigschema import (decodeaction, decodeevent,
+                          splitactions, splitevents)
+from ..types import Tracked
+
+
+class LocalVar(Tracked):
+    __slots__ = ('_owner', 'name', 'val')
 
-class LocalVar:
     def __init__(self, args: str | Sequence):
         if type(args) == str:
             args = args.split(',')
@@ -46,24 +52,48 @@ class LocalVar:
         return f"{self.name} = {self.val}"
 
 
-class Trigger:
-    class Event:
-        def __init__(self):
-            self.id = 0
-            self.params = []
+class Trigger(Tracked):
+    __slots__ = ('_owner', 'id', 'owner', 'assoc', 'name',
+                 'disabled', 'easy', 'normal', 'hard', 'events', 'actions')
+
+    class Event(Tracked):
+        __slots__ = ('_owner', 'id', 'params')
+
+        def __init__(self, eid=0, params=None):
+            self.id = eid
+            self.params = [] if params is None else params
 
         def __str__(self):
             return "{},{}".format(self.id, ",".join(self.params))
 
-    class Action:
-        def __init__(self):
-            self.id = 0
-            self.params = []
+        @property
+        def args(self):
+            """Typed params, see trigschema.EVENTS."""
+            return decodeevent(self.id, self.params)
+
+    class Action(Tracked):
+        __slots__ = ('_owner', 'id', 'params')
+
+        def __init__(self, aid=0, params=None):
+            self.id = aid
+            self.params = [] if params is None else params
 
         def __str__(self):
             return "{},{}".format(self.id, ",".join(self.params))
 
-    def __init__(self, pini, args: tuple[str, str | Sequence]):
+        @property
+        def args(self):
+            """Typed params, see trigschema.ACTIONS."""
+            return decodeaction(self.id, self.params)
+
+    def __init__(self, pini, args: tuple[str, str | Sequence],
+                 events: str = None, actions: str = None):
+        """
+        :param pini: the map, where [Events] and [Actions] are.
+        :param args: ID and value in [Triggers].
+        :param events: raw [Events] value, looked up in pini if None.
+        :param actions: raw [Actions] value, the same as above.
+        """
         self.id = args[0]
         tmeta = args[1].split(',') if type(args[1]) == str else args[1]
         self.owner = tmeta[0]
@@ -74,48 +104,21 @@ class Trigger:
         self.normal = tmeta[5] == '1'
         self.hard = tmeta[6] == '1'
 
-        self.events = self.loadevents(pini)
-        self.actions = self.loadactions(pini)
-
-    def loadevents(self, pini):
-        ret = []
-        # https://github.com/FrozenFog/Ra2-Map-TriggerNetwork
-        sl = pini['Events'][self.id]  # .split(',')
-        num = int(sl[0])
-        i = 1
-        while num > 0:
-            e = Trigger.Event()
-            e.id = int(sl[i])
-            indicator = int(sl[i + 1])
-            i += 1
-            if indicator == 2:
-                e.params = sl[i:i + 3]
-                i += 3
-            else:
-                e.params = sl[i:i + 2]
-                i += 2
-            num -= 1
-            ret.append(e)
-
-        return ret
-
-    def loadactions(self, pini):
-        ret = []
-        # https://github.com/FrozenFog/Ra2-Map-TriggerNetwork
-        sl = pini['Actions'][self.id]  # .split(',')
-        num = int(sl[0])
-        i = 1
-        while num > 0:
-            a = Trigger.Action()
-            a.id = int(sl[i])
-            i += 1
-            a.params = sl[i:i + 7]
-            i += 7
-            num -= 1
-            ret.append(a)
-        return ret
+        self.events = self.loadevents(pini, events)
+        self.actions = self.loadactions(pini, actions)
+
+    def loadevents(self, pini, value: str = None):
+        if value is None:
+            value = pini.getsection('Events').get(self.id, '0')
+        return [Trigger.Event(*i) for i in splitevents(value)]
+
+    def loadactions(self, pini, value: str = None):
+        if value is None:
+            value = pini.getsection('Actions').get(self.id, '0')
+        return [Trigger.Action(*i) for i in splitactions(value)]
 
     def applyevents(self):
+        # "0," for none, as it always was.
         return (self.id,
                 "{},{}".format(
                     len(self.events),
@@ -145,7 +148,9 @@ class Trigger:
         return f'Trigger {self.id}'
 
 
-class Tag:
+class Tag(Tracked):
+    __slots__ = ('_owner', 'id', 'repeat', 'name', 'trigger')
+
     def __init__(self, args: tuple[str, str | Sequence]):
         self.id = args[0]
         param = args[1].split(',') if type(args[1]) == str else args[1]
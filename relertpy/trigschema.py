@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+# @Time: 2026/10/17 23:40
+# @Author: Chloride
+"""
+Table-driven decoding of trigger [Events] and [Actions].
+
+Values of both sections are plain comma-separated text:
+
+    [Events]  ID=count,{event,indicator,p1[,p2 if indicator is 2]}...
+    [Actions] ID=count,{action,code,p1,p2,p3,p4,p5,p6}...
+
+splitevents() and splitactions() walk such a value once, giving
+(id, params) pairs whose params are the raw strings, so that writing
+them back is byte-identical.  decodeevent() and decodeaction() turn
+those params into Param records by EVENTS and ACTIONS:
+
+    for i in decodeaction(80, ['1', '01000654', '0', '0', '0', '0', 'GA']):
+        print(i)  # Param(index=1, kind='team', value='01000654') ...
+
+Action code (the first param) tells what the second one is when it
+isn't 0, like 1 for teams and 2 for triggers, see CODES.  The last
+param of actions is a waypoint written in letters ('A' = 0, 'AA' = 26).
+IDs missing in the tables are left as RAW strings.
+"""
+from typing import NamedTuple, Sequence
+
+__all__ = ['Param', 'EVENTS', 'ACTIONS', 'CODES',
+           'splitevents', 'splitactions', 'decodeevent', 'decodeaction',
+           'waypointcode', 'waypointindex']
+
+RAW = 'raw'
+NUMBER = 'number'
+HOUSE = 'house'
+WAYPOINT = 'waypoint'
+TEAM = 'team'
+TRIGGER = 'trigger'
+TAG = 'tag'
+LOCAL = 'local'
+GLOBAL = 'global'
+TEXT = 'text'
+SPEECH = 'speech'
+SOUND = 'sound'
+THEME = 'theme'
+TECHNO = 'techno'
+BUILDING = 'building'
+UNIT = 'unit'
+INFANTRY = 'infantry'
+AIRCRAFT = 'aircraft'
+
+
+class Param(NamedTuple):
+    """A decoded parameter, index being where it's in params."""
+    index: int
+    kind: str
+    value: int | str
+
+
+# event id -> kinds of params[1:]
+EVENTS = {
+    1: (HOUSE,), 3: (HOUSE,), 5: (HOUSE,),
+    9: (HOUSE,), 10: (HOUSE,), 11: (HOUSE,),
+    12: (NUMBER,), 13: (NUMBER,), 15: (NUMBER,), 16: (NUMBER,),
+    17: (HOUSE,), 18: (HOUSE,),
+    19: (BUILDING,), 20: (UNIT,), 21: (INFANTRY,), 22: (AIRCRAFT,),
+    23: (TEAM,), 24: (HOUSE,), 25: (HOUSE,), 26: (HOUSE,),
+    27: (GLOBAL,), 28: (GLOBAL,), 30: (HOUSE,), 32: (BUILDING,),
+    34: (WAYPOINT,), 36: (LOCAL,), 37: (LOCAL,), 44: (HOUSE,),
+    45: (NUMBER,), 46: (NUMBER,), 47: (NUMBER,),
+    51: (NUMBER,), 52: (NUMBER,), 53: (HOUSE,), 54: (INFANTRY,),
+    55: (HOUSE,), 56: (HOUSE,), 57: (BUILDING,), 58: (HOUSE,),
+    59: (HOUSE,), 60: (NUMBER, TECHNO), 61: (NUMBER, TECHNO),
+}
+# events with indicator 2 carry a type name at last.
+_EVENTSTRING = (NUMBER, TECHNO)
+
+# action id -> {index of params: kind}
+ACTIONS = {
+    1: {1: HOUSE}, 2: {1: HOUSE}, 3: {1: HOUSE},
+    4: {1: TEAM}, 5: {1: TEAM}, 6: {1: HOUSE}, 7: {1: TEAM},
+    8: {6: WAYPOINT}, 9: {1: HOUSE}, 11: {1: TEXT}, 12: {1: TRIGGER},
+    13: {1: HOUSE}, 14: {1: HOUSE}, 19: {1: SOUND}, 20: {1: THEME},
+    21: {1: SPEECH}, 22: {1: TRIGGER},
+    25: {1: NUMBER}, 26: {1: NUMBER}, 27: {1: NUMBER},
+    28: {1: GLOBAL}, 29: {1: GLOBAL},
+    36: {1: HOUSE}, 37: {1: HOUSE}, 38: {1: HOUSE},
+    41: {1: NUMBER, 6: WAYPOINT}, 42: {1: NUMBER, 6: WAYPOINT},
+    43: {1: NUMBER, 6: WAYPOINT}, 48: {1: NUMBER, 6: WAYPOINT},
+    53: {1: TRIGGER}, 54: {1: TRIGGER}, 55: {1: NUMBER, 6: WAYPOINT},
+    56: {1: LOCAL}, 57: {1: LOCAL},
+    58: {1: NUMBER, 6: WAYPOINT}, 59: {6: WAYPOINT},
+    63: {6: WAYPOINT}, 64: {6: WAYPOINT}, 65: {6: WAYPOINT},
+    66: {6: WAYPOINT}, 73: {1: NUMBER}, 74: {1: HOUSE}, 75: {1: HOUSE},
+    80: {1: TEAM, 6: WAYPOINT}, 88: {1: NUMBER, 6: WAYPOINT},
+    89: {6: WAYPOINT}, 90: {6: WAYPOINT}, 94: {6: WAYPOINT},
+    95: {6: WAYPOINT}, 96: {6: WAYPOINT}, 99: {1: SOUND, 6: WAYPOINT},
+    102: {6: WAYPOINT}, 103: {1: TEXT}, 107: {1: TEAM, 6: WAYPOINT},
+    108: {6: WAYPOINT}, 109: {6: WAYPOINT}, 112: {6: WAYPOINT},
+    125: {1: TECHNO, 6: WAYPOINT}, 128: {6: WAYPOINT},
+    135: {6: WAYPOINT}, 137: {6: WAYPOINT},
+}
+# action code -> kind of params[1], as FA2 writes them.
+CODES = {1: TEAM, 2: TRIGGER, 3: TAG, 4: TEXT, 6: SPEECH, 7: SOUND,
+         8: THEME, 10: TECHNO}
+_ACTIONWIDTH = 7
+
+
+def waypointindex(code: str):
+    """'A' -> 0, 'Z' -> 25, 'AA' -> 26, the way action params go."""
+    ret = 0
+    for i in code:
+        ret = ret * 26 + ord(i) - 64
+    return ret - 1
+
+
+def waypointcode(index: int):
+    """The reverse of waypointindex."""
+    ret = []
+    index += 1
+    while index > 0:
+        index, i = divmod(index - 1, 26)
+        ret.append(chr(65 + i))
+    return "".join(reversed(ret))
+
+
+def _number(raw: str):
+    return int(raw) if raw.lstrip('-').isdecimal() else raw
+
+
+def _letters(raw: str):
+    if raw.isalpha() and raw.isascii() and raw.isupper():
+        return waypointindex(raw)
+    return _number(raw)
+
+
+def _string(raw: str):
+    return raw
+
+
+_CONVERTERS = dict.fromkeys((NUMBER, HOUSE, LOCAL, GLOBAL, BUILDING,
+                             UNIT, INFANTRY, AIRCRAFT, WAYPOINT), _number)
+_CONVERTERS.update(dict.fromkeys((RAW, TEAM, TRIGGER, TAG, TEXT, SPEECH,
+                                  SOUND, THEME, TECHNO), _string))
+
+
+def _compile(kinds: dict[int, str]):
+    # (index, kind, converter) of every typed param, in order.
+    return tuple((idx, kind, _letters if idx == _ACTIONWIDTH - 1 and
+                  kind == WAYPOINT else _CONVERTERS[kind])
+                 for idx, kind in sorted(kinds.items()))
+
+
+_EVENTPLANS = {eid: _compile(dict(enumerate(kinds, 1)))
+               for eid, kinds in EVENTS.items()}
+_ACTIONPLANS = {aid: _compile(kinds) for aid, kinds in ACTIONS.items()}
+_EVENTFALLBACK = _compile(dict(enumerate(_EVENTSTRING, 1)))
+
+
+def splitevents(value: str) -> list[tuple[int, list[str]]]:
+    """(event id, params) pairs of an [Events] value."""
+    sl = value.split(',')
+    num = int(sl[0])
+    ret = []
+    i = 1
+    while num > 0 and i < len(sl):
+        # https://github.com/FrozenFog/Ra2-Map-TriggerNetwork
+        width = 3 if sl[i + 1:i + 2] == ['2'] else 2
+        ret.append((int(sl[i]), sl[i + 1:i + 1 + width]))
+        i += 1 + width
+        num -= 1
+    if ret and i < len(sl):
+        # keep what's left, or saving would lose it.
+        ret[-1][1].extend(sl[i:])
+    return ret
+
+
+def splitactions(value: str) -> list[tuple[int, list[str]]]:
+    """(action id, params) pairs of an [Actions] value."""
+    sl = value.split(',')
+    num = int(sl[0])
+    ret = []
+    i = 1
+    while num > 0 and i < len(sl):
+        ret.append((int(sl[i]), sl[i + 1:i + 1 + _ACTIONWIDTH]))
+        i += 1 + _ACTIONWIDTH
+        num -= 1
+    if ret and i < len(sl):
+        ret[-1][1].extend(sl[i:])
+    return ret
+
+
+def _decode(plan, params: Sequence[str], width):
+    ret = []
+    typed = {}
+    for idx, kind, conv in plan:
+        if idx < len(params):
+            typed[idx] = Param(idx, kind, conv(params[idx]))
+    for idx in range(min(width, len(params))):
+        ret.append(typed.get(idx) or Param(idx, RAW, params[idx]))
+    return tuple(ret)
+
+
+def decodeevent(eid: int, params: Sequence[str]) -> tuple[Param, ...]:
+    """Typed params of an event, the indicator as a number."""
+    plan = _EVENTPLANS.get(eid)
+    if plan is None:
+        plan = _EVENTFALLBACK if params[:1] == ['2'] else ()
+    width = 3 if params[:1] == ['2'] else 2
+    return ((Param(0, NUMBER, _number(params[0])),) +
+            _decode(plan, params, width)[1:]) if params else ()
+
+
+def decodeaction(aid: int, params: Sequence[str]) -> tuple[Param, ...]:
+    """Typed params of an action, the code as a number."""
+    if not params:
+        return ()
+    plan = _ACTIONPLANS.get(aid, ())
+    code = _number(params[0])
+    if code in CODES:
+        plan = ((1, CODES[code], _string),
+                *(i for i in plan if i[0] != 1))
+    return ((Param(0, NUMBER, code),) +
+            _decode(plan, params, _ACTIONWIDTH)[1:])
@@ -1,11 +1,13 @@
 # -*- coding: utf-8 -*-
 # @Time: 2022/04/20 21:08
 # @Author: Chloride
-from typing import Sequence, NewType, Iterable
+from typing import Sequence, Iterable
 
 
 class Array(Sequence):
     """Just like arrays in C family."""
+    __slots__ = ('_lst',)
+
     def __init__(self, *args):
         if not args:
             self._lst = list()
@@ -34,16 +36,213 @@ class Array(Sequence):
     def __str__(self):
         return ",".join(map(str, self._lst))
 
+    def copy(self):
+        ret = type(self).__new__(type(self))
+        ret._lst = self._lst.copy()
+        return ret
+
+
+class Tracked:
+    """
+    Map objects telling their owner (mostly a TrackedList)
+    once any public attribute of them changes.
+
+    Lists and Arrays assigned to them get tracked as well,
+    so that in-place edits like 'unit.coord[0] += 1' count.
+
+    Subclasses declare '_owner' in their own __slots__,
+    as Array already takes the layout of TrackedArray.
+    """
+    __slots__ = ()
+
+    def __new__(cls, *args, **kwargs):
+        self = super().__new__(cls)
+        object.__setattr__(self, '_owner', None)
+        return self
+
+    def __setattr__(self, key, value):
+        if key[0] == '_':
+            return object.__setattr__(self, key, value)
+        if type(value) not in _SCALARS:
+            value = track(value, self)
+        object.__setattr__(self, key, value)
+        if self._owner is not None:
+            self._owner._touch()
+
+    def _touch(self):
+        if self._owner is not None:
+            self._owner._touch()
+
+    def __getstate__(self):
+        # leave the owner out, or copying (and pickling) an object
+        # would drag the whole collection along.
+        slots = {}
+        for cls in type(self).__mro__:
+            for i in getattr(cls, '__slots__', ()):
+                if i != '_owner' and i not in slots and hasattr(self, i):
+                    slots[i] = getattr(self, i)
+        return getattr(self, '__dict__', None) or None, slots
+
+
+class TrackedArray(Tracked, Array):
+    __slots__ = ('_owner',)
+
+    def __setitem__(self, k, o):
+        super().__setitem__(k, o)
+        self._touch()
+
+
+class Point2D(TrackedArray):
+    """
+    A cell coordinate as @(x, y), keeping two ints
+    instead of a list inside.
+    """
+    __slots__ = ('x', 'y')
+
+    def __init__(self, xy: Iterable[int] = (0, 0)):
+        self.x, self.y = xy
+
+    @property
+    def _lst(self):
+        return [self.x, self.y]
+
+    @_lst.setter
+    def _lst(self, value):
+        self.x, self.y = value
+
+    def __getitem__(self, k):
+        return (self.x, self.y)[k]
+
+    def __setitem__(self, k, o):
+        if k in (0, -2):
+            self.x = o
+        elif k in (1, -1):
+            self.y = o
+        else:
+            raise IndexError("assignment not in the array.")
+
+    def __len__(self):
+        return 2
+
+    def __iter__(self):
+        return iter((self.x, self.y))
+
+
+class TrackedList(list):
+    """
+    A list knowing whether it (or any item inside) has been
+    changed since the last time 'dirty' got reset.
+
+    Plain lists or Arrays put inside are NOT converted.
+    'version' counts the changes, for caches built upon the list.
+    """
+    __slots__ = ('_owner', 'dirty', 'version')
+
+    def __init__(self, iterable=()):
+        super().__init__(iterable)
+        self._owner = None
+        self.dirty = False
+        self.version = 0
+        for i in self:
+            if type(i) not in _SCALARS:
+                _adopt(i, self)
+
+    def __reduce__(self):
+        # items through __init__, so that they get adopted before
+        # anything touches the list, and the owner left out as
+        # Tracked does.
+        return (type(self), (list(self),),
+                (None, {'dirty': self.dirty, 'version': self.version}))
+
+    def _touch(self):
+        self.dirty = True
+        self.version += 1
+        if self._owner is not None:
+            self._owner._touch()
+
+    def __setitem__(self, k, v):
+        if isinstance(k, slice):
+            v = [_adopt(i, self) for i in v]
+        else:
+            v = _adopt(v, self)
+        super().__setitem__(k, v)
+        self._touch()
+
+    def __delitem__(self, k):
+        super().__delitem__(k)
+        self._touch()
+
+    def __iadd__(self, other):
+        self.extend(other)
+        return self
+
+    def __imul__(self, n):
+        super().__imul__(n)
+        self._touch()
+        return self
+
+    def append(self, obj):
+        super().append(_adopt(obj, self))
+        self._touch()
+
+    def extend(self, iterable):
+        super().extend(_adopt(i, self) for i in iterable)
+        self._touch()
+
+    def insert(self, index, obj):
+        super().insert(index, _adopt(obj, self))
+        self._touch()
+
+    def pop(self, index=-1):
+        ret = super().pop(index)
+        self._touch()
+        return ret
+
+    def remove(self, value):
+        super().remove(value)
+        self._touch()
+
+    def clear(self):
+        super().clear()
+        self._touch()
+
+    def sort(self, *, key=None, reverse=False):
+        super().sort(key=key, reverse=reverse)
+        self._touch()
+
+    def reverse(self):
+        super().reverse()
+        self._touch()
+
+
+_SCALARS = frozenset((int, float, str, bool, type(None)))
+
+
+def track(obj, owner):
+    """Let owner know the changes of obj, which might be converted."""
+    if type(obj) is list:
+        obj = TrackedList(obj)
+    elif type(obj) is Array:
+        obj, src = TrackedArray.__new__(TrackedArray), obj
+        obj._lst = src._lst.copy()
+    return _adopt(obj, owner)
+
+
+def _adopt(obj, owner):
+    if isinstance(obj, (Tracked, TrackedList)):
+        obj._owner = owner
+    return obj
+
 
 class Coord:
     @staticmethod
     def split(obj_coord: str):
-        x = int(obj_coord) % 1000
-        y = int(obj_coord.rsplit(f'{x:03d}', 1)[0])
+        # row 0 leaves no digits of y, like '18' for (18, 0).
+        y, x = divmod(int(obj_coord), 1000)
         return x, y
 
     @staticmethod
-    def join(point: NewType('Point2D', Array)):
+    def join(point: Array):
         return "%d" % (1000 * point[1] + point[0])
 
 
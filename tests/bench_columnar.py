@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+# @Time: 2026/10/17 20:40
+# @Author: Chloride
+"""
+Columnar tables against per-object loops, on awither.map.
+
+Both sides build their view of [Units], [Infantry] and [Structures],
+then pick damaged objects of one house and repair them.
+"""
+import _context
+
+import os
+import timeit
+
+import relertpy as rpy
+from relertpy.columnar import loadtables
+
+SAMPLE = os.path.join(os.path.dirname(__file__), 'awither.map')
+OWNER = 'MODBase House'
+
+
+def byobjects(pmap):
+    for name in ('units', 'infantries', 'buildings'):
+        vars(pmap).pop(name, None)
+        for i in getattr(pmap, name):
+            if i.owner == OWNER and i.health < 256:
+                i.health = 256
+
+
+def bytables(pmap):
+    for table in loadtables(pmap).values():
+        mask = table.isin('owner', OWNER) & (table['health'] < 256)
+        table['health'][mask] = 256
+
+
+def bench_columnar(rounds=10):
+    pmap = rpy.CCMap(SAMPLE, 'utf-8')
+    objs = min(timeit.repeat(lambda: byobjects(pmap),
+                             number=1, repeat=rounds))
+    cols = min(timeit.repeat(lambda: bytables(pmap),
+                             number=1, repeat=rounds))
+    tables = loadtables(pmap)
+    dump = min(timeit.repeat(lambda: [i.apply() for i in tables.values()],
+                             number=1, repeat=rounds))
+    print("objects(ms) %.2f    tables(ms) %.2f    tables to text(ms) %.2f"
+          % (objs * 1e3, cols * 1e3, dump * 1e3))
+
+
+if __name__ == '__main__':
+    bench_columnar()
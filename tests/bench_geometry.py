@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+# @Time: 2026/10/18 4:50
+# @Author: Chloride
+"""
+Mirroring awither.map left to right, object by object
+against geometry.transform.
+"""
+import _context
+
+import os
+import timeit
+
+import relertpy as rpy
+from relertpy.geometry import mirror, transform
+from relertpy.spatial import KINDS
+from relertpy.types import Point2D
+
+SAMPLE = os.path.join(os.path.dirname(__file__), 'awither.map')
+
+
+def byobjects(pmap, flip):
+    for kind in KINDS:
+        vars(pmap).pop(kind, None)
+        for i in getattr(pmap, kind):
+            if isinstance(i, Point2D):
+                i[0], i[1] = flip(i[0], i[1])
+            else:
+                i.coord = Point2D(flip(*i.coord))
+                if hasattr(i, 'facing'):
+                    i.facing = (192 - i.facing) % 256
+    pmap.sync()
+
+
+def bench_geometry(rounds=10):
+    pmap = rpy.CCMap(SAMPLE, 'utf-8')
+    flip = mirror(pmap, 'vertical')
+    objs = min(timeit.repeat(lambda: byobjects(pmap, flip),
+                             number=1, repeat=rounds))
+    cols = min(timeit.repeat(lambda: transform(pmap, flip),
+                             number=1, repeat=rounds))
+    print("objects(ms) %.2f    transform(ms) %.2f"
+          % (objs * 1e3, cols * 1e3))
+
+
+if __name__ == '__main__':
+    bench_geometry()
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+# @Time: 2026/10/17 15:40
+# @Author: Chloride
+"""
+Loading benchmark of INIClass.
+
+awither.map gets repeated with renamed sections, so that the time
+spent per section shows whether loading still grows linearly.
+"""
+import _context
+
+import os
+import re
+import tempfile
+import timeit
+
+import relertpy.ccini as ini
+from relertpy.cache import ParseCache
+
+SAMPLE = os.path.join(os.path.dirname(__file__), 'awither.map')
+
+
+def scaled(times):
+    with open(SAMPLE, 'r', encoding='utf-8') as fp:
+        text = fp.read()
+    header = re.compile(r"^\[([^\]]+)\]", re.M)
+    return "".join(header.sub(r"[\1_%d]" % i, text) for i in range(times))
+
+
+def bench_load(rounds=5):
+    print("sections    load(ms)    per section(us)    lazy load(ms)")
+    with tempfile.TemporaryDirectory() as tmp:
+        for times in (1, 2, 4, 8):
+            dst = os.path.join(tmp, 'scaled%d.ini' % times)
+            with open(dst, 'w', encoding='utf-8') as fp:
+                fp.write(scaled(times))
+            cost = min(timeit.repeat(lambda: ini.CCINIClass(dst),
+                                     number=1, repeat=rounds))
+            lazy = min(timeit.repeat(lambda: ini.CCINIClass(dst, lazy=True),
+                                     number=1, repeat=rounds))
+            count = len(ini.CCINIClass(dst))
+            print("%8d    %8.2f    %15.3f    %13.2f"
+                  % (count, cost * 1e3, cost * 1e6 / count, lazy * 1e3))
+
+
+def bench_lookup(number=100000):
+    sect = ini.INISectionClass('Bench', Int='120', Float='0.25',
+                               Bool='yes', Array='E1, E2, E3, GGI',
+                               String='GAPOWR')
+    print("key       first lookup(ns)    repeated lookup(ns)")
+    for key in ('Int', 'Float', 'Bool', 'Array', 'String'):
+        raw = sect.get(key)
+
+        def first():
+            sect[key] = raw  # drops the parsed value.
+            return sect[key]
+
+        cold = min(timeit.repeat(first, number=number, repeat=3))
+        warm = min(timeit.repeat(lambda: sect[key], number=number, repeat=3))
+        print("%-6s    %16.1f    %19.1f"
+              % (key, cold * 1e9 / number, warm * 1e9 / number))
+
+
+def bench_inherit(depth=8, number=100000):
+    chain = ini.INIClass()
+    chain.loads("".join("[Level%d]:[Level%d]\nKey%d=%d\n" % (i, i + 1, i, i)
+                        for i in range(depth)) + "[Level%d]\nRoot=1\n" % depth)
+    leaf = chain['Level0']
+    walk = min(timeit.repeat(lambda: leaf['Root'], number=number, repeat=3))
+    chain.flatten()
+    flat = min(timeit.repeat(lambda: leaf['Root'], number=number, repeat=3))
+    print("depth %d    walking(ns) %.1f    flattened(ns) %.1f"
+          % (depth, walk * 1e9 / number, flat * 1e9 / number))
+
+
+def bench_save(rounds=10):
+    sample = ini.CCINIClass(SAMPLE)
+    with tempfile.TemporaryDirectory() as tmp:
+        dst = os.path.join(tmp, 'saved.map')
+        save = min(timeit.repeat(lambda: sample.save(dst),
+                                 number=1, repeat=rounds))
+    dump = min(timeit.repeat(sample.dumps, number=1, repeat=rounds))
+    print("save(ms) %.2f    dumps(ms) %.2f" % (save * 1e3, dump * 1e3))
+
+
+def bench_cache(rounds=10):
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ParseCache(tmp)
+        cold = min(timeit.repeat(lambda: ini.CCINIClass(SAMPLE),
+                                 number=1, repeat=rounds))
+        ini.CCINIClass(SAMPLE, cache=cache)
+        warm = min(timeit.repeat(lambda: ini.CCINIClass(SAMPLE, cache=cache),
+                                 number=1, repeat=rounds))
+    print("uncached(ms) %.2f    cached(ms) %.2f" % (cold * 1e3, warm * 1e3))
+
+
+if __name__ == '__main__':
+    bench_load()
+    bench_lookup()
+    bench_inherit()
+    bench_save()
+    bench_cache()
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+# @Time: 2026/10/17 18:20
+# @Author: Chloride
+"""
+Saving benchmark of MapClass.
+
+Every collection gets marked as changed before saving, so that the
+time covers re-serializing all triggers, teams and objects.
+"""
+import _context
+
+import os
+import tempfile
+import timeit
+
+import relertpy as rpy
+from relertpy.types import TrackedList
+
+SAMPLE = os.path.join(os.path.dirname(__file__), 'awither.map')
+
+
+def touchall(pmap):
+    for i in vars(pmap).values():
+        if isinstance(i, TrackedList):
+            i.dirty = True
+
+
+def bench_save(rounds=10):
+    pmap = rpy.CCMap(SAMPLE, 'utf-8')
+    print("triggers %d    teams %d    scripts %d    objects %d"
+          % (len(pmap.triggers), len(pmap.teams), len(pmap.scripts),
+             len(pmap.infantries) + len(pmap.units) +
+             len(pmap.buildings) + len(pmap.aircrafts)))
+    with tempfile.TemporaryDirectory() as tmp:
+        dst = os.path.join(tmp, 'saved.map')
+
+        def full():
+            touchall(pmap)
+            pmap.save(dst)
+
+        clean = min(timeit.repeat(lambda: pmap.save(dst),
+                                  number=1, repeat=rounds))
+        dirty = min(timeit.repeat(full, number=1, repeat=rounds))
+    print("unchanged save(ms) %.2f    full save(ms) %.2f"
+          % (clean * 1e3, dirty * 1e3))
+
+
+if __name__ == '__main__':
+    bench_save()
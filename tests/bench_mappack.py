@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+# @Time: 2026/10/17 22:00
+# @Author: Chloride
+"""
+Pack section codecs on awither.map.
+
+awither.map keeps no [IsoMapPack5], so a 160x200 tile layer
+like its [Map] Size gets generated and round-tripped.
+Its overlays get round-tripped, after clearing all ore.
+"""
+import _context
+
+import os
+import timeit
+
+import numpy as np
+
+import relertpy as rpy
+from relertpy.mappack import (ISOTILE, OVERLAY_NONE, loadoverlays,
+                              loadtiles, saveoverlays, savetiles)
+
+SAMPLE = os.path.join(os.path.dirname(__file__), 'awither.map')
+
+
+def maketiles(width, height, seed=0):
+    xs, ys = np.meshgrid(np.arange(width + height + 1),
+                         np.arange(width + height + 1))
+    inside = ((xs + ys > width) & (xs + ys <= width + 2 * height) &
+              (np.abs(xs - ys) < width))
+    tiles = np.zeros(inside.sum(), ISOTILE)
+    tiles['x'], tiles['y'] = xs[inside], ys[inside]
+    rng = np.random.default_rng(seed)
+    # mostly clear ground, like real maps.
+    tiles['tile'] = np.where(rng.random(len(tiles)) < 0.8, 0,
+                             rng.integers(0, 700, len(tiles)))
+    tiles['level'] = rng.integers(0, 3, len(tiles))
+    return tiles
+
+
+def bench_tiles(rounds=5):
+    pmap = rpy.CCMap(SAMPLE, 'utf-8')
+    width, height = map(int, pmap.getvalue('Map', 'Size')[2:])
+    tiles = maketiles(width, height)
+    encode = min(timeit.repeat(lambda: savetiles(pmap, tiles),
+                               number=1, repeat=rounds))
+    decode = min(timeit.repeat(lambda: loadtiles(pmap),
+                               number=1, repeat=rounds))
+    assert (loadtiles(pmap) == tiles).all()
+    print("tiles %d    encode(ms) %.1f    decode(ms) %.1f"
+          % (len(tiles), encode * 1e3, decode * 1e3))
+
+
+def bench_overlays(rounds=5):
+    pmap = rpy.CCMap(SAMPLE, 'utf-8')
+    types, frames = loadoverlays(pmap)
+    decode = min(timeit.repeat(lambda: loadoverlays(pmap),
+                               number=1, repeat=rounds))
+    # ore overlays are TIB01-TIB20, indexed 102-121.
+    ores = (types >= 102) & (types <= 121)
+    types[ores] = OVERLAY_NONE
+    frames[ores] = 0
+    encode = min(timeit.repeat(lambda: saveoverlays(pmap, types, frames),
+                               number=1, repeat=rounds))
+    after = loadoverlays(pmap)
+    assert (after[0] == types).all() and (after[1] == frames).all()
+    print("ore cells %d    encode(ms) %.1f    decode(ms) %.1f"
+          % (ores.sum(), encode * 1e3, decode * 1e3))
+
+
+if __name__ == '__main__':
+    bench_tiles()
+    bench_overlays()
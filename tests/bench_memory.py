@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+# @Time: 2026/10/17 19:05
+# @Author: Chloride
+"""
+Memory benchmark of MapClass collections.
+
+Every collection of awither.map is built under tracemalloc,
+to see how many bytes each map object costs, against the objects
+of the baseline tree (plain classes, lists for coordinates and
+params) measured the same way.
+"""
+import _context
+
+import gc
+import os
+import tracemalloc
+
+import relertpy as rpy
+from relertpy.types import TrackedList
+
+SAMPLE = os.path.join(os.path.dirname(__file__), 'awither.map')
+COLLECTIONS = ('waypoints', 'terrains', 'celltags', 'smudges',
+               'triggers', 'tags', 'localvars', 'infantries',
+               'units', 'buildings', 'aircrafts')
+# bytes per object, freed by dropping the collections of the
+# baseline tree (3612252), which built them all on loading.
+BASELINE = {'waypoints': 209.1, 'terrains': 226.1, 'celltags': 176.6,
+            'smudges': 466.9, 'triggers': 1818.4, 'tags': 250.7,
+            'localvars': 193.6, 'infantries': 590.7, 'units': 581.9,
+            'buildings': 597.6, 'aircrafts': None}
+
+
+def _freed(objs):
+    # bytes released once objs go, the way BASELINE got measured.
+    before = tracemalloc.get_traced_memory()[0]
+    objs.clear()
+    gc.collect()
+    return before - tracemalloc.get_traced_memory()[0]
+
+
+def bench_memory():
+    pmap = rpy.CCMap(SAMPLE, 'utf-8')
+    print("collection    objects    per object(B)    baseline(B)    ratio")
+    tracemalloc.start()
+    for name in COLLECTIONS:
+        objs = [getattr(pmap, name)]
+        count = len(objs[0])
+        vars(pmap).pop(name)
+        cost = _freed(objs) / max(count, 1)
+        base = BASELINE[name]
+        if base is None or not count:
+            print("%-10s    %7d    %13s    %11s    %5s"
+                  % (name, count, '-', '-', '-'))
+        else:
+            print("%-10s    %7d    %13.1f    %11.1f    %5.2f"
+                  % (name, count, cost, base, cost / base))
+    objs = [[TrackedList(['1', '2', '3']) for _ in range(1000)]]
+    tracked = _freed(objs) / 1000
+    objs = [[['1', '2', '3'] for _ in range(1000)]]
+    plain = _freed(objs) / 1000
+    tracemalloc.stop()
+    print("TrackedList(B) %.1f    list(B) %.1f" % (tracked, plain))
+
+
+def bench_clone(variants=100):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    pmap = rpy.CCMap(SAMPLE, 'utf-8')
+    loaded = tracemalloc.get_traced_memory()[0] - before
+    clones = [pmap.clone() for _ in range(variants)]
+    for idx, i in enumerate(clones):
+        i['Basic']['Name'] = f"Variant {idx}"
+    cost = tracemalloc.get_traced_memory()[0] - before - loaded
+    tracemalloc.stop()
+    print("map(KiB) %.1f    per clone(KiB) %.1f"
+          % (loaded / 1024, cost / 1024 / len(clones)))
+
+
+if __name__ == '__main__':
+    bench_memory()
+    bench_clone()
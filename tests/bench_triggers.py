@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+# @Time: 2026/10/17 23:50
+# @Author: Chloride
+"""
+Trigger loading benchmark of MapClass, on awither.map.
+
+Triggers get rebuilt from [Triggers], [Events] and [Actions],
+then every event and action param is decoded by the schema.
+"""
+import _context
+
+import os
+import timeit
+
+import relertpy as rpy
+
+SAMPLE = os.path.join(os.path.dirname(__file__), 'awither.map')
+
+
+def bench_triggers(rounds=10):
+    pmap = rpy.CCMap(SAMPLE, 'utf-8')
+
+    def build():
+        vars(pmap).pop('triggers', None)
+        return pmap.triggers
+
+    def decode():
+        return [i.args for trig in pmap.triggers
+                for i in (*trig.events, *trig.actions)]
+
+    load = min(timeit.repeat(build, number=1, repeat=rounds))
+    typed = min(timeit.repeat(decode, number=1, repeat=rounds))
+    print("triggers %d    build(ms) %.2f    typed params(ms) %.2f"
+          % (len(pmap.triggers), load * 1e3, typed * 1e3))
+
+
+if __name__ == '__main__':
+    bench_triggers()
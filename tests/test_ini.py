@@ -3,12 +3,151 @@
 # @Author: Chloride
 import _context
 
+import os
+import tempfile
+import unittest
+
 import relertpy.ccini as ini
+import relertpy.inidiff as inidiff
+from relertpy.cache import ParseCache
+from relertpy.rulesdb import LayeredINI
+
+SAMPLE = os.path.join(os.path.dirname(__file__), 'eg.ini')
+
+
+class TestSave(unittest.TestCase):
+    def test_nonstr_keys(self):
+        config = ini.INIClass()
+        config.addnew('List')
+        config['List'][1] = 'A'
+        config['List']['2'] = True
+        with tempfile.TemporaryDirectory() as tmp:
+            dst = os.path.join(tmp, 'out.ini')
+            config.save(dst)
+            with open(dst, encoding='utf-8') as fp:
+                self.assertEqual(fp.read().split(), ['[List]', '1=A',
+                                                     '2=yes'])
+
+
+class TestParent(unittest.TestCase):
+    def test_same_parent(self):
+        config = ini.INIClass()
+        config.loads("[B]\nK=1\n[A]:[B]\n")
+        config.loads("[A]:[B]\n")
+        a, b = config['A'], config['B']
+        a.parent = a.parent
+        a.copyfrom(a.clone())
+        config.flatten()
+        b['New'] = 'v'
+        self.assertEqual(a.get('New'), 'v')
+
+
+class TestCache(unittest.TestCase):
+    def test_unwritable(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            # a file where the cache directory should be.
+            blocker = os.path.join(tmp, 'cache')
+            open(blocker, 'w').close()
+            config = ini.CCINIClass(SAMPLE, cache=ParseCache(blocker))
+        self.assertEqual(list(config), list(ini.CCINIClass(SAMPLE)))
+
+    def test_warm(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ParseCache(tmp)
+            cold = ini.CCINIClass(SAMPLE, cache=cache)
+            self.assertEqual(len(cache.entries()), 1)
+            warm = ini.CCINIClass(SAMPLE, cache=cache)
+        self.assertEqual(
+            {i: dict(warm[i].items(useraw=True)) for i in warm},
+            {i: dict(cold[i].items(useraw=True)) for i in cold})
+
+
+class TestLayered(unittest.TestCase):
+    def setUp(self):
+        self.rules = ini.INIClass()
+        self.rules.loads("[MTNK]\nCost=700\nSpeed=6\n"
+                         "[Y]:[MTNK]\nName=Y\n")
+        self.map = ini.INIClass()
+        self.map.loads("[MTNK]\nCost=900\n"
+                       "[X]:[MTNK]\nArmor=heavy\n")
+        self.view = LayeredINI(self.rules).overlay(self.map)
+
+    def test_parent_below(self):
+        self.assertEqual(self.view.get('X', 'Speed'), '6')
+        self.assertEqual(self.view.get('X', 'Cost'), '900')
+        self.assertIs(self.view.owner('X', 'Speed'), self.rules['MTNK'])
+
+    def test_parent_above(self):
+        self.assertEqual(self.view.get('Y', 'Cost'), '900')
+        self.assertEqual(dict(self.view.getsection('Y')),
+                         {'Cost': '900', 'Speed': '6', 'Name': 'Y'})
+
+    def test_loop(self):
+        # each layer fine by itself.
+        self.rules.loads("[A]:[B]\nK=1\n")
+        self.map.loads("[B]:[A]\n")
+        self.view.invalidate()
+        self.assertEqual(self.view.get('B', 'K'), '1')
+        self.assertIsNone(self.view.get('B', 'Z'))
+
+
+class TestDiff(unittest.TestCase):
+    def setUp(self):
+        self.old = ini.CCINIClass(SAMPLE)
+        self.new = self.old.clone()
+        self.new['ExampleVehicle']['Cost'] = '15'
+        del self.new['ExampleVehicle']['Sight']
+        self.new.remove('ExampleEmpty')
+        self.new.addnew('ExampleAdded')
+        self.new['ExampleAdded'] = {'Cost': '1'}
+
+    @staticmethod
+    def dump(config):
+        return {i: (None if config[i].parent is None
+                    else str(config[i].parent),
+                    dict(config[i].items(useraw=True))) for i in config}
+
+    def test_roundtrip(self):
+        patch = inidiff.loads(inidiff.dumps(inidiff.diff(self.old,
+                                                         self.new)))
+        self.assertEqual(patch['removed'], ['ExampleEmpty'])
+        self.assertEqual(patch['changed']['ExampleVehicle']['old'],
+                         {'Cost': '12', 'Sight': '9.4'})
+        target = ini.CCINIClass(SAMPLE)
+        self.assertEqual(inidiff.apply(target, patch), [])
+        self.assertEqual(self.dump(target), self.dump(self.new))
+        self.assertEqual(inidiff.diff(target, self.new),
+                         {'added': {}, 'removed': [], 'changed': {}})
+
+    def test_parent(self):
+        self.new['ExampleInherit'].parent = 'ExampleAdded'
+        patch = inidiff.diff(self.old, self.new)
+        self.assertEqual(patch['changed']['ExampleInherit']['parent'],
+                         ['ExampleVehicle', 'ExampleAdded'])
+        target = ini.CCINIClass(SAMPLE)
+        inidiff.apply(target, patch)
+        self.assertIs(target['ExampleInherit'].parent,
+                      target['ExampleAdded'])
+        self.assertEqual(target['ExampleInherit'].get('Cost'), '1')
+
+    def test_strict(self):
+        patch = inidiff.diff(self.old, self.new)
+        target = ini.CCINIClass(SAMPLE)
+        target['ExampleVehicle']['Cost'] = '20'
+        before = self.dump(target)
+        with self.assertRaises(ValueError):
+            inidiff.apply(target, patch, strict=True)
+        self.assertEqual(self.dump(target), before)
+        self.assertEqual(inidiff.apply(target, patch),
+                         [('ExampleVehicle', 'Cost', '12', '20')])
+        self.assertEqual(target['ExampleVehicle']['Cost'], 15)
+
 
-config1 = ini.CCINIClass(".\\eg.ini")
-# config2 = ini.INIClass()
+if __name__ == '__main__':
+    config1 = ini.CCINIClass(".\\eg.ini")
+    # config2 = ini.INIClass()
 
-print(config1['ExampleInherit']['IsCasheenBurnt'])
-print(config1['ExampleInherit']['VoiceDoi'])
+    print(config1['ExampleInherit']['IsCasheenBurnt'])
+    print(config1['ExampleInherit']['VoiceDoi'])
 
-config1.save(".\\ego.ini")
+    config1.save(".\\ego.ini")
@@ -3,12 +3,333 @@
 # @Author: Chloride
 import _context
 
+import copy
+import os
+import shutil
+import tempfile
+import unittest
+from hashlib import md5
+from struct import unpack_from
+
+import numpy as np
+
 import relertpy as rpy
+from relertpy.batch import run
+from relertpy.codec import (format5_decode, format5_encode,
+                            format80_decode, lzo_decompress)
+from relertpy.columnar import ObjectTable
+from relertpy.encrypt import _hashnames, gethasher
+from relertpy.geometry import mirror, rotate180, transform, translate
+from relertpy.mappack import (OVERLAY_NONE, loadoverlays, readpack,
+                              saveoverlays, writepack)
+from relertpy.merge import merge
+
+try:
+    import lzo  # python-lzo, the reference LZO1X
+except ImportError:
+    lzo = None
+
+SAMPLE = os.path.join(os.path.dirname(__file__), 'awither.map')
+# [IsoMapPack4] of the sample keeps 10-byte records, no ice growth.
+ISOTILE4 = np.dtype([('x', '<u2'), ('y', '<u2'), ('tile', '<i4'),
+                     ('subtile', 'u1'), ('level', 'u1')])
+WIDTH, HEIGHT = 160, 200  # [Map] Size of the sample
+
+
+def inmap(x, y):
+    x, y = np.asarray(x, int), np.asarray(y, int)
+    return ((x + y > WIDTH) & (x + y <= WIDTH + 2 * HEIGHT) &
+            (abs(x - y) < WIDTH))
+
+
+def unitcount(pmap):
+    # a batch transform, which workers import from here.
+    if pmap.getsection('Basic').get('Name') == 'odd':
+        return lambda: None  # can't be sent back by workers
+    return len(pmap.units)
+
+
+class TestPacks(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.pmap = rpy.CCMap(SAMPLE, 'utf-8')
+
+    def test_isomappack(self):
+        data = format5_decode(readpack(self.pmap, 'IsoMapPack4'))
+        self.assertEqual(md5(data).hexdigest(),
+                         'ee3b11321c3770c5db58667e64fff9a2')
+        tiles = np.frombuffer(data, ISOTILE4)
+        # FA2 writes every cell of the map once, and nothing else.
+        self.assertEqual(len(tiles), HEIGHT * (2 * WIDTH - 1))
+        self.assertTrue(inmap(tiles['x'], tiles['y']).all())
+        self.assertEqual(len(set(zip(tiles['x'].tolist(),
+                                     tiles['y'].tolist()))), len(tiles))
+        self.assertEqual(tuple(tiles[0])[:2], (160, 1))
+        self.assertEqual(int((tiles['tile'] == 0xFFFF).sum()), 6752)
+        self.assertEqual(int(tiles['level'].max()), 12)
+
+    def test_overlaypack(self):
+        types, frames = loadoverlays(self.pmap)
+        self.assertEqual(md5(types.tobytes()).hexdigest(),
+                         'e2295316be0b54a35f89c45373632830')
+        self.assertEqual(md5(frames.tobytes()).hexdigest(),
+                         'af0392f7fe08f9298410a355b313ac17')
+        y, x = np.nonzero(types != OVERLAY_NONE)
+        self.assertEqual(len(x), 10315)
+        self.assertTrue(inmap(x, y).all())
+        self.assertEqual((int(types[30, 144]), int(frames[30, 144])),
+                         (175, 0))
+
+    def test_roundtrip(self):
+        data = format5_decode(readpack(self.pmap, 'IsoMapPack4'))
+        packed = format5_encode(data)
+        self.assertEqual(format5_decode(packed), data)
+        pmap = self.pmap.clone()
+        writepack(pmap, 'IsoMapPack4', packed)
+        self.assertEqual(format5_decode(readpack(pmap, 'IsoMapPack4')),
+                         data)
+
+        types, frames = loadoverlays(self.pmap)
+        saveoverlays(pmap, types, frames)
+        again = loadoverlays(pmap)
+        self.assertTrue((again[0] == types).all())
+        self.assertTrue((again[1] == frames).all())
+        # one block of 8192 cells each, as the game reads them.
+        raw = readpack(pmap, 'OverlayPack')
+        size, full = unpack_from('<HH', raw)
+        self.assertEqual(full, 8192)
+        self.assertEqual(len(format80_decode(raw[4:4 + size])), full)
+
+    @unittest.skipIf(lzo is None, 'python-lzo is not installed')
+    def test_reference_lzo(self):
+        raw = readpack(self.pmap, 'IsoMapPack4')
+        data = format5_decode(raw)
+        # blocks packed by FA2 and by us unpack the same both ways.
+        for packed in (raw, format5_encode(data)):
+            out, pos = [], 0
+            while pos < len(packed):
+                size, full = unpack_from('<HH', packed, pos)
+                block = packed[pos + 4:pos + 4 + size]
+                out.append(lzo.decompress(block, False, full))
+                self.assertEqual(lzo_decompress(block, full), out[-1])
+                pos += 4 + size
+            self.assertEqual(b''.join(out), data)
+
+
+class TestBatch(unittest.TestCase):
+    def test_workers(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for i in ('a', 'c'):
+                shutil.copy(SAMPLE, os.path.join(tmp, f'{i}.map'))
+            with open(os.path.join(tmp, 'b.map'), 'wb') as fp:
+                fp.write(b'[Basic]\nName=\xff\n')
+            results = [[(os.path.basename(j.path), j.ok, j.value,
+                         j.error and j.error.splitlines()[-1])
+                        for j in run(tmp, unitcount, workers=i,
+                                     chunksize=3, save=False,
+                                     encoding='utf-8')]
+                       for i in (1, 2)]
+            self.assertEqual(results[0], results[1])
+            self.assertEqual([i[:3] for i in results[0]],
+                             [('a.map', True, 681), ('b.map', False, None),
+                              ('c.map', True, 681)])
+            self.assertIn('UnicodeDecodeError', results[0][1][3])
+
+            with open(os.path.join(tmp, 'b.map'), 'w') as fp:
+                fp.write('[Basic]\nName=odd\n')
+            results = list(run(tmp, unitcount, workers=2, chunksize=3,
+                               save=False, encoding='utf-8'))
+        self.assertEqual([i.ok for i in results], [True, False, True])
+        self.assertIn('pickle', results[1].error)
+
+
+class TestTracked(unittest.TestCase):
+    def test_copy(self):
+        units = rpy.CCMap(SAMPLE, 'utf-8').units
+        self.assertFalse(hasattr(units, '__dict__'))
+        units[0].health = 7
+        again = copy.deepcopy(units)
+        self.assertEqual((again.dirty, again.version),
+                         (units.dirty, units.version))
+        self.assertIs(again[0]._owner, again)
+        again[1].health = 8
+        self.assertEqual(again.version, units.version + 1)
+
+
+class TestColumnar(unittest.TestCase):
+    def test_edited_collection(self):
+        pmap = rpy.CCMap(SAMPLE, 'utf-8')
+        count = len(pmap.units)
+        pmap.units[0].health = 7
+        pmap.units.append(rpy.structs.Vehicle.fromvalue(
+            pmap.getsection('Units').get('1')))
+        pmap.infantries[0].health = 9
+        table = ObjectTable.fromsection(pmap, 'Units')
+        self.assertEqual(len(table), count + 1)
+        self.assertEqual(int(table['health'][0]), 7)
+        table['health'][1] = 8
+        table.save(pmap)
+        self.assertEqual([i.health for i in pmap.units[:2]], [7, 8])
+        self.assertEqual(len(pmap.units), count + 1)
+        self.assertEqual(pmap.infantries[0].health, 9)
+
+
+class TestMerge(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.base = rpy.CCMap(SAMPLE, 'utf-8')
+        cls.base.sync()
+
+    @staticmethod
+    def addteam(pmap, idx, name):
+        pmap.addnew(idx)
+        pmap[idx] = {'Name': name}
+        teams = pmap['TeamTypes']
+        teams[str(len(teams))] = idx
+
+    def test_keys(self):
+        ours, theirs = self.base.clone(), self.base.clone()
+        ours['Basic']['Name'] = 'Ours'
+        theirs['Basic']['Author'] = 'Theirs'
+        ours['Basic']['Percent'] = '1'
+        theirs['Basic']['Percent'] = '2'
+        merged = merge(self.base, ours, theirs)
+        basic = merged.result['Basic']
+        self.assertEqual((basic.get('Name'), basic.get('Author'),
+                          basic.get('Percent')), ('Ours', 'Theirs', '1'))
+        self.assertEqual([i[:2] for i in merged.conflicts],
+                         [('Basic', 'Percent')])
+        merged = merge(self.base, ours, theirs, prefer='theirs')
+        self.assertEqual(merged.result['Basic'].get('Percent'), '2')
+
+    def test_clash(self):
+        ours, theirs = self.base.clone(), self.base.clone()
+        self.addteam(ours, '01999999', 'A')
+        self.addteam(theirs, '01999999', 'B')
+        trigger = next(iter(self.base['Triggers'].items(useraw=True)))[1]
+        theirs['Triggers']['01999998'] = trigger
+        theirs['Actions']['01999998'] = '1,4,1,01999999,0,0,0,0,A'
+        ours['Triggers']['01999998'] = trigger.replace('0', '1', 1)
+
+        merged = merge(self.base, ours, theirs)
+        self.assertEqual(merged.conflicts, [])
+        team = merged.renamed['01999999']
+        trig = merged.renamed['01999998']
+        result = merged.result
+        self.assertNotIn(team, self.base['TeamTypes'].values(useraw=True))
+        self.assertEqual((result['01999999'].get('Name'),
+                          result[team].get('Name')), ('A', 'B'))
+        self.assertEqual(
+            list(result['TeamTypes'].values(useraw=True))[-2:],
+            ['01999999', team])
+        # references follow the new IDs.
+        self.assertEqual(result['Actions'].get(trig),
+                         f'1,4,1,{team},0,0,0,0,A')
+        self.assertEqual(result['Triggers'].get('01999998'),
+                         ours['Triggers'].get('01999998'))
+
+
+class TestTriggers(unittest.TestCase):
+    def test_save(self):
+        pmap = rpy.CCMap(SAMPLE, 'utf-8')
+        idx = next(iter(pmap['Triggers']))
+        pmap['Actions'][idx] = '0,'
+        raw = {i: dict(pmap[i].items(useraw=True))
+               for i in ('Triggers', 'Events', 'Actions')}
+        self.assertEqual(pmap.triggers[0].actions, [])
+        # any edit, so that saving writes triggers back.
+        pmap.triggers[0].easy = pmap.triggers[0].easy
+        with tempfile.TemporaryDirectory() as tmp:
+            dst = os.path.join(tmp, 'out.map')
+            pmap.save(dst)
+            again = rpy.CCMap(dst, 'utf-8')
+        for name, options in raw.items():
+            self.assertEqual(dict(again[name].items(useraw=True)), options)
+
+
+class TestEncrypt(unittest.TestCase):
+    def test_workers(self):
+        names = [f'name{i}' for i in range(64)]
+        hasher = gethasher('barcode')
+        hashed = list(_hashnames(names, hasher, 2).values())
+        # workers don't repeat the barcodes of one another.
+        self.assertNotEqual(hashed[:32], hashed[32:])
+        seeded = gethasher('barcode', seed=1)
+        self.assertEqual(_hashnames(names, seeded, 2),
+                         _hashnames(names, seeded, 1))
+        self.assertEqual(len(_hashnames(names, hasher, None, shard=16)), 64)
+
+
+class TestIDs(unittest.TestCase):
+    def test_direct_keys(self):
+        pmap = rpy.CCMap(SAMPLE, 'utf-8')
+        ids = pmap.regids
+        first = ids.next()
+        # written straight into sections, no collection built.
+        following = "%08d" % (int(first) + 1)
+        pmap['Triggers'][following] = next(
+            iter(pmap['Triggers'].values(useraw=True)))
+        pmap['Tags']["%08d" % (int(first) + 2)] = '0,tag,' + following
+        self.assertIn(following, ids)
+        self.assertEqual(ids.next(), "%08d" % (int(first) + 3))
+
+    def test_scans(self):
+        pmap = rpy.CCMap(SAMPLE, 'utf-8')
+        ids, scanned = pmap.regids, []
+        scan = ids._scan
+        ids._scan = lambda kind: scanned.append(kind) or scan(kind)
+        ids.take(100)
+        self.assertEqual(len(scanned), 6)
+        # sections once, collections once they change.
+        ids.take(100)
+        pmap.triggers[0].name = 'moved'
+        ids.next()
+        self.assertEqual(scanned[6:], ['triggers'])
+        self.assertNotIn(pmap.triggers.pop().id, ids)
+
+
+class TestGeometry(unittest.TestCase):
+    def test_mirror(self):
+        pmap = rpy.CCMap(SAMPLE, 'utf-8')
+        y, x = np.mgrid[:WIDTH + HEIGHT + 1, :WIDTH + HEIGHT + 1]
+        x, y = x[inmap(x, y)], y[inmap(x, y)]
+        flip = mirror(pmap, 'vertical')
+        self.assertTrue(inmap(*flip(x, y)).all())
+        self.assertEqual(flip.then(flip), translate(0, 0))
+        # the last row can't be mirrored top to bottom.
+        nx, ny = rotate180(pmap)(x, y)
+        self.assertEqual(int((~inmap(nx, ny)).sum()), WIDTH)
+
+        units = list(pmap['Units'].values(useraw=True))
+        offmap = transform(pmap, flip)
+        self.assertFalse(offmap['units'].any())
+        facing = int(units[0].split(',')[5])
+        self.assertEqual(pmap.units[0].facing, (192 - facing) % 256)
+        transform(pmap, flip)
+        self.assertEqual(list(pmap['Units'].values(useraw=True)), units)
+
+    def test_off_top_left(self):
+        pmap = rpy.CCMap(SAMPLE, 'utf-8')
+        kinds = ('waypoints', 'terrains', 'celltags')
+        before = {i: list(getattr(pmap, i)) for i in kinds}
+        offmap = transform(pmap, translate(-150, -50), kinds=kinds)
+        for kind in kinds:
+            cells = [(int(i[0]) - 150, int(i[1]) - 50)
+                     for i in before[kind]]
+            fits = np.array([min(i) >= 0 for i in cells])
+            self.assertTrue(offmap[kind][~fits].all())
+            # those still on the coordinate range, moved.
+            cells = [i for i, j in zip(cells, fits) if j]
+            self.assertTrue(0 < len(cells) < len(before[kind]))
+            self.assertEqual(sorted(tuple(i) for i in getattr(pmap, kind)),
+                             sorted(cells))
+
 
-wither = rpy.CCMap('.\\awither.map')
-for i in wither.teams:
-    print(i)
-wither.save()
+if __name__ == '__main__':
+    wither = rpy.CCMap('.\\awither.map')
+    for i in wither.teams:
+        print(i)
+    wither.save()
 
-# wither_c = rpy.CCMap("D:\\wither.map")
-# print(len(wither) == len(wither_c))
+    # wither_c = rpy.CCMap("D:\\wither.map")
+    # print(len(wither) == len(wither_c))